@@ -0,0 +1,269 @@
+# Capacity-aware placement of a whole cohort of students into sections.
+# Every student brings a ranked list of schedule options (main.generate_schedules, best first); a section can
+# only take Avail_Seats students. Instead of placing students one after the other (first come takes the best
+# sections), all students choose at once and overfull sections get a price: each round, students whose
+# options touch a repriced section re-pick the option with the lowest score + price. A final repair pass moves
+# the students that are cheapest to move out of any section that is still overfull. Students whose options all
+# ran out of seats are searched again without the full sections, so nobody is left out while seats remain.
+import time
+from collections import defaultdict
+
+from main import default_config, open_session, process_corequisites, retrieve_section_info
+from schedule_cache import make_cache_key
+from session import ScheduleSession, flatten_courses
+
+def allocate_sections(student_options, capacities, max_rounds=200, price_step=1.0, patience=20):
+    """
+    Assign one option to every student without exceeding section capacities.
+
+    student_options: per student, the ranked options as (score, section_names), lower score is better.
+    capacities: section name -> seats left; sections that are not listed are unlimited.
+    Returns (choices, report): the chosen option index per student (None if no option fits) and the
+    rounds / moves of the run.
+    """
+    options = [[(score, tuple(sections)) for score, sections in student] for student in student_options]
+    prices = defaultdict(float)
+    load = defaultdict(int)
+    students_of_section = defaultdict(set)  # students with any option using the section
+
+    def priced(student, option):
+        score, sections = options[student][option]
+        return score + sum(prices[section] for section in sections)
+
+    def best_option(student, current=None):
+        best = current
+        best_cost = priced(student, current) if current is not None else None
+        for option in range(len(options[student])):
+            cost = priced(student, option)
+            if best_cost is None or cost < best_cost:
+                best, best_cost = option, cost
+        return best
+
+    def take(student, option, amount):
+        if option is not None:
+            for section in options[student][option][1]:
+                load[section] += amount
+
+    # Start from everybody's individual optimum
+    choices = []
+    for student, student_options_list in enumerate(options):
+        for _, sections in student_options_list:
+            for section in sections:
+                students_of_section[section].add(student)
+        choices.append(0 if student_options_list else None)
+        take(student, choices[student], 1)
+
+    def overfull():
+        return {section: load[section] - capacities[section]
+                for section in load if section in capacities and load[section] > capacities[section]}
+
+    rounds = 0
+    moves = 0
+    excess = overfull()
+    best_excess = sum(excess.values())
+    stale_rounds = 0
+    # Stop when every section fits, or when the overflow has not shrunk for `patience` rounds (more students
+    # than seats: prices would keep rising without ever clearing, the repair pass decides who is left out)
+    while excess and rounds < max_rounds and stale_rounds < patience:
+        rounds += 1
+        for section, over in excess.items():
+            prices[section] += price_step * (1 + over / max(capacities[section], 1))
+        affected = set()
+        for section in excess:
+            affected |= students_of_section[section]
+        for student in sorted(affected):
+            option = best_option(student, choices[student])
+            if option != choices[student]:
+                take(student, choices[student], -1)
+                take(student, option, 1)
+                choices[student] = option
+                moves += 1
+        excess = overfull()
+        total_excess = sum(excess.values())
+        if total_excess < best_excess:
+            best_excess, stale_rounds = total_excess, 0
+        else:
+            stale_rounds += 1
+
+    def fits(sections):
+        return all(load[section] < capacities.get(section, float('inf')) for section in sections)
+
+    # Repair: move the students whose next fitting option costs them the least, until nothing is overfull
+    repaired = 0
+    for section in sorted(excess):
+        while load[section] > capacities[section]:
+            best_move = None
+            for student in sorted(students_of_section[section]):
+                current = choices[student]
+                if current is None or section not in options[student][current][1]:
+                    continue
+                take(student, current, -1)
+                for option, (score, sections) in enumerate(options[student]):
+                    if section in sections or not fits(sections):
+                        continue
+                    loss = score - options[student][current][0]
+                    if best_move is None or loss < best_move[0]:
+                        best_move = (loss, student, option)
+                    break  # options are ranked, the first that fits is the student's best
+                take(student, current, 1)
+            if best_move is None:
+                # Nobody in the section can move anywhere else: the last of them loses the placement
+                student = max(student for student in students_of_section[section]
+                              if choices[student] is not None and section in options[student][choices[student]][1])
+                best_move = (None, student, None)
+            _, student, option = best_move
+            take(student, choices[student], -1)
+            take(student, option, 1)
+            choices[student] = option
+            repaired += 1
+
+    # Seats freed by the repair go to the students left without a placement, in their ranked order
+    for student, choice in enumerate(choices):
+        if choice is None:
+            for option, (_, sections) in enumerate(options[student]):
+                if fits(sections):
+                    take(student, option, 1)
+                    choices[student] = option
+                    repaired += 1
+                    break
+
+    return choices, {"rounds": rounds, "moves": moves, "repaired": repaired}
+
+def open_session_without(sections_info, courses, excluded):
+    """
+    Search session over courses (sections_info as returned by main.process_corequisites) without the excluded
+    sections. A section whose corequisites are all excluded is left out as well.
+    """
+    remaining = {}
+    for course, sections in sections_info.items():
+        remaining[course] = []
+        for section, coreqs in sections:
+            open_coreqs = [coreq for coreq in coreqs if coreq["Name"] not in excluded]
+            if section["Name"] in excluded or (coreqs and not open_coreqs):
+                continue
+            remaining[course].append((section, open_coreqs))
+    return ScheduleSession(courses, remaining)
+
+def plan_cohort(cursor, students, options_per_student=20, max_rounds=200, capacities=None):
+    """
+    Place a cohort of students into sections under the Avail_Seats limits.
+
+    students: dicts with "id", "courses" and optionally "modality_preferences", "unavailability_blocks" and
+    "config", as for main.generate_schedules. Students asking for the same courses share one search session,
+    identical requests share one search.
+    Students whose options_per_student best options are all full after the allocation are searched again
+    without the full sections, one after the other, until they are placed or no schedule is left for them;
+    options found that way are ranked after the first options_per_student.
+    Returns (placements, summary). Each placement reports the student's sections, their score, their
+    individual optimum and the score_loss between the two (None when the student could not be placed).
+    """
+    start = time.perf_counter()
+    sessions = {}
+    ranked_by_request = {}  # students with identical requests share their ranked options
+    student_options = []
+    student_requests = []
+    sections_by_name = {}
+
+    def rank(results):
+        ranked = []
+        for position in range(len(results)):
+            sections = results.combination(position)
+            for section in sections:
+                sections_by_name.setdefault(section["Name"], section)
+            ranked.append((results[position][1], [section["Name"] for section in sections]))
+        return ranked
+
+    for student in students:
+        courses = student["courses"]
+        modality_preferences = student.get("modality_preferences") or {}
+        unavailability_blocks = student.get("unavailability_blocks") or {}
+        config = student.get("config") or default_config(modality_preferences)
+        request_key = make_cache_key(courses, modality_preferences, unavailability_blocks, config, options_per_student, 0)
+        ranked = ranked_by_request.get(request_key)
+        if ranked is None:
+            session_key = request_key[0]
+            session = sessions.get(session_key)
+            if session is None:
+                session = sessions[session_key] = open_session(cursor, courses)
+            ranked = ranked_by_request[request_key] = rank(session.run(unavailability_blocks, config, options_per_student))
+        student_options.append(ranked)
+        student_requests.append((request_key, courses, unavailability_blocks, config))
+    search_seconds = time.perf_counter() - start
+
+    own_capacities = capacities is None
+    if own_capacities:
+        capacities = {name: section["Avail_Seats"] for name, section in sections_by_name.items()}
+    choices, report = allocate_sections(student_options, capacities, max_rounds)
+
+    # Search again for the students left out, without the sections that are full by now
+    retry_start = time.perf_counter()
+    load = defaultdict(int)
+    for ranked, choice in zip(student_options, choices):
+        if choice is not None:
+            for name in ranked[choice][1]:
+                load[name] += 1
+
+    def fits(sections):
+        return all(load[name] < capacities.get(name, float('inf')) for name in sections)
+
+    sections_info_by_courses = {}
+    retried_by_request = {}  # request key -> options of the last search without the full sections
+    exhausted = {request[0] for request, ranked in zip(student_requests, student_options) if not ranked}  # no schedule left
+    retry_searches = 0
+    for student, choice in enumerate(choices):
+        request_key, courses, unavailability_blocks, config = student_requests[student]
+        if choice is not None or request_key in exhausted:
+            continue
+        option = next((option for option in retried_by_request.get(request_key, ()) if fits(option[1])), None)
+        if option is None:
+            sections_info = sections_info_by_courses.get(request_key[0])
+            if sections_info is None:
+                sections_info, section_columns = retrieve_section_info(cursor, flatten_courses(courses))
+                sections_info, _ = process_corequisites(cursor, sections_info, section_columns)
+                sections_info_by_courses[request_key[0]] = sections_info
+            full = {name for name, seats in capacities.items() if load[name] >= seats}
+            session = open_session_without(sections_info, courses, full)
+            retried = retried_by_request[request_key] = rank(session.run(unavailability_blocks, config, options_per_student))
+            retry_searches += 1
+            if own_capacities:
+                for _, sections in retried:
+                    for name in sections:
+                        capacities.setdefault(name, sections_by_name[name]["Avail_Seats"])
+            option = next((option for option in retried if fits(option[1])), None)
+            if option is None:
+                exhausted.add(request_key)
+                continue
+        student_options[student] = student_options[student] + [option]
+        choices[student] = len(student_options[student]) - 1
+        for name in option[1]:
+            load[name] += 1
+    retry_seconds = time.perf_counter() - retry_start
+
+    placements = []
+    for student, ranked, choice in zip(students, student_options, choices):
+        best_score = ranked[0][0] if ranked else None
+        score = ranked[choice][0] if choice is not None else None
+        placements.append({
+            "id": student.get("id"),
+            "sections": ranked[choice][1] if choice is not None else [],
+            "option": choice + 1 if choice is not None else None,  # rank of the option among the student's options
+            "score": score,
+            "best_score": best_score,
+            "score_loss": score - best_score if choice is not None else None,
+        })
+
+    losses = [placement["score_loss"] for placement in placements if placement["score_loss"] is not None]
+    summary = {
+        "students": len(placements),
+        "placed": len(losses),
+        "unplaced": len(placements) - len(losses),
+        "at_optimum": sum(1 for loss in losses if loss == 0),
+        "total_score_loss": sum(losses),
+        "max_score_loss": max(losses, default=0),
+        "search_seconds": search_seconds,
+        "allocation_seconds": retry_start - start - search_seconds,
+        "retry_searches": retry_searches,
+        "retry_seconds": retry_seconds,
+        **report,
+    }
+    return placements, summary
@@ -0,0 +1,91 @@
+# asyncio front end of the schedule search, for web front ends.
+# The search runs in an executor thread; its progress callback (see session.ScheduleSession.run) forwards
+# throttled progress events and improved top-K snapshots to the event loop, and checks a cancel flag, so an
+# abandoned search stops within one progress interval (PROGRESS_EVERY search nodes, about a millisecond).
+import asyncio
+import threading
+import time
+
+from catalog import CatalogPool
+from main import default_config, open_session
+from session import SearchCancelled
+
+class AsyncScheduler:
+    """
+    Runs schedule searches off the event loop.
+
+    Example (inside a coroutine):
+        scheduler = AsyncScheduler()
+        async for event in scheduler.search(["ENG-103", "PSY-103"], modality_preferences, unavailability_blocks):
+            if event["type"] == "progress": ...    # explored / pruned counters, best_score
+            elif event["type"] == "snapshot": ...  # event["results"]: best schedules so far
+            elif event["type"] == "done": ...      # event["results"]: final ScheduleResults
+    Leaving the loop early (break, or cancelling the task that iterates) stops the search.
+    """
+    def __init__(self, pool=None, executor=None, progress_interval=0.1, snapshot_interval=0.25):
+        self.pool = pool or CatalogPool()
+        self.executor = executor  # None: the loop's default ThreadPoolExecutor
+        self.progress_interval = progress_interval  # seconds between progress events
+        self.snapshot_interval = snapshot_interval  # seconds between top-K snapshots (only when they improved)
+
+    async def search(self, selected_courses, modality_preferences, unavailability_blocks, config=None, top_k=50):
+        """
+        Async generator of progress, snapshot and done events for one search.
+        """
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        cancelled = threading.Event()
+        config = config or default_config(modality_preferences)
+        emitted = {"progress": 0.0, "snapshot": 0.0}
+        pending_snapshot = [False]
+
+        def publish(event):
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        def progress(event):
+            # Runs in the worker thread, between two search steps
+            if cancelled.is_set():
+                raise SearchCancelled()
+            if event is None:
+                return
+            now = time.perf_counter()
+            pending_snapshot[0] = pending_snapshot[0] or event["improved"]
+            if now - emitted["progress"] >= self.progress_interval:
+                emitted["progress"] = now
+                publish({"type": "progress", **{name: value for name, value in event.items() if name not in ("improved", "snapshot")}})
+            if pending_snapshot[0] and now - emitted["snapshot"] >= self.snapshot_interval:
+                emitted["snapshot"] = now
+                pending_snapshot[0] = False
+                publish({"type": "snapshot", "results": event["snapshot"]()})
+
+        def work():
+            try:
+                session = open_session(self.pool.cursor(), selected_courses)
+                if cancelled.is_set():
+                    raise SearchCancelled()
+                publish({"type": "done", "results": session.run(unavailability_blocks, config, top_k, progress=progress)})
+            except SearchCancelled:
+                pass  # nobody is listening any more
+            except Exception as e:
+                publish({"type": "error", "error": e})
+
+        loop.run_in_executor(self.executor, work)
+        try:
+            while True:
+                event = await events.get()
+                if event["type"] == "error":
+                    raise event["error"]
+                yield event
+                if event["type"] == "done":
+                    return
+        finally:
+            # Consumer gone (done, break, task cancelled): the worker stops at its next progress check
+            cancelled.set()
+
+    async def generate_schedules(self, selected_courses, modality_preferences, unavailability_blocks, config=None, top_k=50):
+        """
+        Await the final results only (cancelling the awaiting task cancels the search).
+        """
+        async for event in self.search(selected_courses, modality_preferences, unavailability_blocks, config, top_k):
+            if event["type"] == "done":
+                return event["results"]
@@ -0,0 +1,187 @@
+# Reproducible, non-interactive benchmark of the scheduling pipeline on synthetic catalogs
+# Usage: python benchmark.py [--min-courses 2] [--max-courses 8] [--output results.json] [--baseline old.json]
+# The cold-start benchmark of the command line (run_startup) is run by `python cli.py bench startup`.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from instrumentation import PipelineStats
+from main import default_config, generate_schedules
+import synthetic_catalog
+
+DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
+
+def availability_blocks(start_time, end_time, days_off=()):
+    '''Unavailability blocks in the format of availability.get_availability().'''
+    blocks = {day: [('12:00 AM', start_time), (end_time, '11:59 PM')] for day in DAYS if day not in days_off}
+    for day in days_off:
+        blocks[day] = [('12:00 AM', '11:59 PM')]
+    return blocks
+
+# Fixed student scenarios: (unavailability blocks, modality preference for every course)
+SCENARIOS = {
+    "open": (availability_blocks('12:00 AM', '11:59 PM'), None),
+    "daytime": (availability_blocks('08:00 AM', '03:00 PM', days_off=('Sat',)), 'LEC'),
+    "mwf_off": (availability_blocks('08:00 AM', '09:00 PM', days_off=('Mon', 'Wed', 'Fri', 'Sat')), None),
+}
+
+def run_case(cursor, courses, scenario, top_k, repeat):
+    '''Run one scenario: median wall time over repeat runs (at least one), then one traced run for peak memory.'''
+    if repeat < 1:
+        raise ValueError(f"repeat must be at least 1, got {repeat}")
+    unavailability_blocks, preference = SCENARIOS[scenario]
+    modality_preferences = {course: preference for course in courses}
+    config = default_config(modality_preferences)
+
+    timings = []
+    for _ in range(repeat):
+        stats = PipelineStats()
+        start = time.perf_counter()
+        results = generate_schedules(cursor, courses, modality_preferences, unavailability_blocks, config, top_k, stats)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    generate_schedules(cursor, courses, modality_preferences, unavailability_blocks, config, top_k)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "scenario": scenario,
+        "courses": len(courses),
+        "seconds": statistics.median(timings),
+        "peak_kb": round(peak_memory / 1024, 1),
+        "explored": stats.counters["partial_schedules_explored"],
+        "valid": stats.counters["valid_schedules"],
+        "emitted": len(results),
+    }
+
+def run_suite(min_courses=2, max_courses=8, sections_per_course=8, coreq_share=0.2, top_k=50, repeat=3,
+              scenarios=None, seed=0):
+    '''Build the synthetic catalog and run every scenario for min_courses..max_courses requested courses.'''
+    rows = synthetic_catalog.generate_catalog(
+        num_courses=max(max_courses, 10), sections_per_course=sections_per_course, coreq_share=coreq_share, seed=seed
+    )
+    conn = synthetic_catalog.build_database(rows)
+    cursor = conn.cursor()
+    courses = synthetic_catalog.course_names(rows)
+
+    results = []
+    for scenario in scenarios or SCENARIOS:
+        for num_courses in range(min_courses, max_courses + 1):
+            results.append(run_case(cursor, courses[:num_courses], scenario, top_k, repeat))
+    conn.close()
+
+    params = {
+        "sections_per_course": sections_per_course, "coreq_share": coreq_share, "top_k": top_k,
+        "repeat": repeat, "seed": seed, "catalog_rows": len(rows),
+    }
+    return {"params": params, "results": results}
+
+def print_report(report, baseline=None):
+    '''Print the scaling table; with a baseline report, add the time ratio against it (<1 = faster).'''
+    baseline_times = {}
+    if baseline:
+        baseline_times = {(case["scenario"], case["courses"]): case["seconds"] for case in baseline["results"]}
+
+    print(f"{'scenario':<10} {'courses':>7} {'seconds':>10} {'peak KB':>10} {'explored':>10} {'valid':>10} {'emitted':>8}" +
+          (f" {'vs base':>8}" if baseline else ""))
+    for case in report["results"]:
+        line = (f"{case['scenario']:<10} {case['courses']:>7} {case['seconds']:>10.4f} {case['peak_kb']:>10} "
+                f"{case['explored']:>10} {case['valid']:>10} {case['emitted']:>8}")
+        base_seconds = baseline_times.get((case["scenario"], case["courses"]))
+        if base_seconds:
+            line += f" {case['seconds'] / base_seconds:>7.2f}x"
+        print(line)
+
+CLI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+
+# Modules the `schedule` command must not load (they belong to ingest, serve, batch and the async API)
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "http.server", "multiprocessing", "concurrent.futures", "asyncio")
+
+def startup_commands(courses, db_name):
+    '''Commands timed by run_startup: the bare interpreter as the floor, the CLI without work, and one schedule.'''
+    return {
+        "python -c pass": [sys.executable, "-c", "pass"],
+        "cli.py --help": [sys.executable, CLI_PATH, "--help"],
+        "cli.py schedule": [sys.executable, CLI_PATH, "schedule", *courses, "--db", db_name, "--top-k", "10",
+                            "--format", "jsonl"],
+    }
+
+def loaded_heavy_modules(courses, db_name):
+    '''Run the schedule command in a fresh interpreter and list the HEAVY_MODULES it imported.'''
+    probe = (
+        f"import contextlib, io, json, sys; sys.path.insert(0, {os.path.dirname(CLI_PATH)!r}); import cli\n"
+        f"with contextlib.redirect_stdout(io.StringIO()): cli.main({['schedule', *courses, '--db', db_name]!r})\n"
+        f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))"
+    )
+    completed = subprocess.run([sys.executable, "-c", probe], check=True, capture_output=True, text=True)
+    return json.loads(completed.stdout)
+
+def run_startup(courses=("ENG-103", "PSY-103"), db_name="schedule.db", runs=20):
+    '''Wall time of fresh processes (median, min, max over runs) for each startup command.'''
+    results = []
+    for label, command in startup_commands(courses, db_name).items():
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+            timings.append(time.perf_counter() - start)
+        results.append({
+            "command": label,
+            "median_ms": round(statistics.median(timings) * 1000, 1),
+            "min_ms": round(min(timings) * 1000, 1),
+            "max_ms": round(max(timings) * 1000, 1),
+        })
+    params = {"courses": list(courses), "db_name": db_name, "runs": runs, "python": sys.version.split()[0]}
+    return {"params": params, "results": results, "heavy_modules": loaded_heavy_modules(courses, db_name)}
+
+def print_startup_report(report, budget_ms=None):
+    '''Print the startup table; with budget_ms, return False when the schedule command misses the budget.'''
+    print(f"{'command':<18} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+    for case in report["results"]:
+        print(f"{case['command']:<18} {case['median_ms']:>10} {case['min_ms']:>8} {case['max_ms']:>8}")
+    print(f"heavy modules loaded by schedule: {', '.join(report['heavy_modules']) or 'none'}")
+    if budget_ms is None:
+        return True
+    schedule_ms = report["results"][-1]["median_ms"]
+    within = schedule_ms <= budget_ms and not report["heavy_modules"]
+    print(f"schedule startup {schedule_ms} ms, budget {budget_ms} ms: {'ok' if within else 'FAILED'}")
+    return within
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler on a synthetic catalog.")
+    parser.add_argument("--min-courses", type=int, default=2)
+    parser.add_argument("--max-courses", type=int, default=8)
+    parser.add_argument("--sections", type=int, default=8, help="sections per course")
+    parser.add_argument("--coreq-share", type=float, default=0.2, help="share of courses with a co-requisite lab")
+    parser.add_argument("--top-k", type=int, default=50, help="schedules to keep (0 = all)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="run only these scenarios")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    report = run_suite(
+        args.min_courses, args.max_courses, args.sections, args.coreq_share, args.top_k or None, args.repeat,
+        args.scenario, args.seed
+    )
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+
+if __name__ == "__main__":
+    main()
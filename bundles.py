@@ -0,0 +1,63 @@
+# Precomputed schedules for popular course bundles (e.g. a program's first semester).
+# After an import, generate_db.precompute_bundles stores the conflict-free class combinations of each bundle
+# in the bundle_schedules side table. main.open_session picks them up for a request over the same courses,
+# so run() only applies the student's availability filter and scores instead of searching.
+import json
+import sqlite3
+from array import array
+
+from catalog import get_catalog_version
+from session import slot_courses
+
+BUNDLE_TABLE = 'bundle_schedules'
+
+def bundle_key(selected_courses):
+    """
+    Order-independent key of a course bundle (alternatives of a slot included).
+    """
+    return json.dumps(sorted(sorted(slot_courses(slot)) for slot in selected_courses))
+
+def load_precomputed(cursor, session):
+    """
+    Attach the stored combinations of the session's bundle, if any are stored for the current catalog.
+    Returns True when the session will skip the search.
+    """
+    try:
+        cursor.execute(f"""
+            SELECT catalog_version, courses, classes, count, gap_config, schedules, class_masks, profiles, profile_masks
+            FROM {BUNDLE_TABLE}
+            WHERE bundle = ?
+        """, (bundle_key(session.selected_courses),))
+    except sqlite3.OperationalError:
+        return False  # no bundles precomputed for this database
+    row = cursor.fetchone()
+    if row is None or row[0] != get_catalog_version(cursor):
+        return False
+    _, courses, classes, count, gap_config, schedules, class_masks, profiles, profile_masks = row
+
+    # The stored slots may be in another order than the session's
+    stored_slots = [sorted(slot_courses(slot)) for slot in json.loads(courses)]
+    try:
+        slot_order = [stored_slots.index(sorted(slot_courses(slot))) for slot in session.selected_courses]
+    except ValueError:
+        return False
+
+    mask_size = (count + 7) // 8
+
+    def mask(blob, k):
+        return int.from_bytes(blob[k * mask_size:(k + 1) * mask_size], 'little')
+
+    stored_classes = [[[tuple(option) for option in members] for members in slot_classes] for slot_classes in json.loads(classes)]
+    combinations = array('H')
+    combinations.frombytes(schedules)
+    stored_masks = []
+    k = 0
+    for slot_classes in stored_classes:
+        stored_masks.append([mask(class_masks, k + position) for position in range(len(slot_classes))])
+        k += len(slot_classes)
+    buckets = [(days, gap_score, mask(profile_masks, k)) for k, (days, gap_score) in enumerate(json.loads(profiles))]
+
+    return session.attach_precomputed({
+        "classes": stored_classes, "combinations": combinations, "class_masks": stored_masks,
+        "buckets": buckets, "gap_config": json.loads(gap_config),
+    }, slot_order)
@@ -0,0 +1,119 @@
+# Read-only access to the catalog database (schedule.db) for the scheduler, the course index and services.
+# Every thread gets its own long-lived read-only connection from a CatalogPool; the fixed queries below are
+# module constants, so each connection's statement cache (sqlite3 cached_statements) prepares them once and
+# reuses them. generate_db.py switches the database to WAL, so readers keep working while a new catalog loads.
+import sqlite3
+import threading
+
+DB_NAME = 'schedule.db'
+MMAP_SIZE = 256 * 1024 * 1024  # map the catalog file into memory instead of copying pages into the page cache
+
+SECTION_COLUMNS = ("Name, Avail_Seats, Printed_Comments, Corequisite, STime, ETime, SDate, EDate, Mtg_Days, Method, "
+                   "Credits, Restricted_Section, Cohort, STime_Extra, ETime_Extra")
+
+# Open sections of a course (main.retrieve_section_info)
+COURSE_SECTIONS_QUERY = f"""
+    SELECT {SECTION_COLUMNS}
+    FROM schedule
+    WHERE Course_Name = ? AND Status = 'A' AND Avail_Seats > 0
+"""
+
+# One open section by name (main.process_corequisites)
+SECTION_QUERY = f"""
+    SELECT {SECTION_COLUMNS}
+    FROM schedule
+    WHERE Name = ? AND Status = 'A' AND Avail_Seats > 0
+"""
+
+# Every open section with its course, for shared_catalog.SharedCatalog.publish
+OPEN_SECTIONS_QUERY = f"""
+    SELECT Course_Name, {SECTION_COLUMNS}
+    FROM schedule
+    WHERE Status = 'A' AND Avail_Seats > 0
+    ORDER BY rowid
+"""
+
+# Every section, for course_index.CourseIndex (course lookups in user_input.get_course_names)
+COURSE_INDEX_QUERY = """
+    SELECT Course_Name, Short_Title, Method, Status, Avail_Seats, Corequisite, Sec_Course_Types
+    FROM schedule
+    ORDER BY rowid
+"""
+
+def get_catalog_version(cursor):
+    """
+    Return the catalog version stamped by generate_db.import_to_sqlite (0 for databases built before versioning).
+    """
+    cursor.execute("PRAGMA user_version")
+    return cursor.fetchone()[0]
+
+def connect(db_name=DB_NAME, mmap_size=MMAP_SIZE, check_same_thread=True):
+    """
+    Open a read-only connection to the catalog.
+    """
+    conn = sqlite3.connect(f"file:{db_name}?mode=ro", uri=True, check_same_thread=check_same_thread,
+                           cached_statements=64)
+    conn.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+class CatalogPool:
+    """
+    One read-only catalog connection per thread, created on first use and kept for the life of the pool.
+    sqlite3 connections must not be shared between threads; with the pool, each worker thread of a
+    ThreadPoolExecutor (or an HTTP server) reads through its own connection and its own prepared statements.
+    """
+    def __init__(self, db_name=DB_NAME, mmap_size=MMAP_SIZE):
+        self.db_name = db_name
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._closed = False
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread=False only so close() can run from the thread shutting the pool down
+            conn = connect(self.db_name, self.mmap_size, check_same_thread=False)
+            with self._lock:
+                if self._closed:
+                    conn.close()
+                    raise sqlite3.ProgrammingError("CatalogPool is closed")
+                self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def cursor(self):
+        """
+        A new cursor on this thread's connection.
+        """
+        return self.connection().cursor()
+
+    def release(self):
+        """
+        Close the calling thread's connection, for short-lived threads (e.g. one thread per HTTP connection).
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+            conn.close()
+
+    def close(self):
+        """
+        Close every pooled connection. Call once the worker threads are done.
+        """
+        with self._lock:
+            self._closed = True
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,237 @@
+# Command-line entry point of the scheduler:
+#   python cli.py ingest   [file] [--db schedule.db] [--precompute] [--bundle ENG-103,PSY-103,...]
+#   python cli.py schedule ENG-103 "MAT-143|MAT-152" [--modality ENG-103=LEC] [--unavailable "Mon 12:00 AM-10:00 AM"]
+#   python cli.py batch    requests.jsonl [--workers 4] [--cohort]
+#   python cli.py serve    [--host 127.0.0.1] [--port 8000] [--profile DIR] [--profile-every 100]
+#   python cli.py bench    [startup|search] [...]
+#   python cli.py loadtest [--target direct|service] [--rate 20] [--concurrency 8] [...]  (see loadtest.py)
+# Only argparse is imported up front; each subcommand imports what it needs when it runs, so `schedule` (one
+# process per student at the kiosk) does not pay for pandas, http.server or multiprocessing.
+import argparse
+import sys
+
+DB_NAME = 'schedule.db'  # same default as catalog.DB_NAME, without importing sqlite3 to parse the arguments
+DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat')
+
+def parse_slot(entry):
+    """
+    "MAT-143|MAT-152" -> ("MAT-143", "MAT-152"): any one of the alternatives will do.
+    """
+    courses = tuple(course.strip() for course in entry.split('|') if course.strip())
+    return courses if len(courses) > 1 else courses[0]
+
+def parse_unavailable(entries):
+    """
+    ["Mon 12:00 AM-10:00 AM", ...] -> unavailability blocks in the format of availability.get_availability().
+    """
+    blocks = {}
+    for entry in entries:
+        day, _, times = entry.strip().partition(' ')
+        start, _, end = times.partition('-')
+        if day not in DAYS or not start.strip() or not end.strip():
+            raise argparse.ArgumentTypeError(f"expected 'Day H:MM AM-H:MM PM' with Day in {', '.join(DAYS)}, got {entry!r}")
+        blocks.setdefault(day, []).append((start.strip(), end.strip()))
+    return blocks
+
+def parse_modalities(entries):
+    """
+    ["ENG-103=LEC", ...] -> modality preferences per course.
+    """
+    preferences = {}
+    for entry in entries:
+        course, _, method = entry.partition('=')
+        if not course or not method:
+            raise argparse.ArgumentTypeError(f"expected COURSE=METHOD, got {entry!r}")
+        preferences[course.strip()] = method.strip()
+    return preferences
+
+def run_ingest(args):
+    import generate_db
+    bundles = [[course.strip() for course in bundle.split(',')] for bundle in args.bundle] if args.bundle else None
+    generate_db.main(args.file, args.db, args.precompute or bool(bundles), bundles)
+
+def run_schedule(args):
+    import main
+    if not args.courses:
+        main.main()  # interactive: prompts for courses and availability
+        return
+
+    import catalog
+    import output
+    selected_courses = [parse_slot(entry) for entry in args.courses]
+    modality_preferences = parse_modalities(args.modality or [])
+    unavailability_blocks = parse_unavailable(args.unavailable or [])
+    stats = None
+    if args.stats:
+        from instrumentation import PipelineStats
+        stats = PipelineStats()
+
+    conn = catalog.connect(args.db)
+    try:
+        results = main.generate_schedules(conn.cursor(), selected_courses, modality_preferences, unavailability_blocks,
+                                          top_k=args.top_k or None, stats=stats)
+    finally:
+        conn.close()
+    writers = {"text": output.write_text, "jsonl": output.write_jsonl, "csv": output.write_csv}
+    writers[args.format](results, sys.stdout, args.offset, args.limit)
+    if stats is not None:
+        print(stats.format_summary(), file=sys.stderr)
+
+def read_requests(file_name):
+    """
+    Requests of a batch: a JSON list, or JSON lines, of objects as accepted by the service's POST /schedules.
+    """
+    import json
+    with (sys.stdin if file_name == '-' else open(file_name)) as request_file:
+        text = request_file.read()
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def run_batch(args):
+    import json
+
+    import catalog
+    from service import parse_courses, parse_request
+
+    requests = read_requests(args.requests)
+    if args.cohort:
+        from allocation import plan_cohort
+        students = [{**request, "id": request.get("id", number), "courses": parse_courses(request.get("courses"))}
+                    for number, request in enumerate(requests, 1)]
+        conn = catalog.connect(args.db)
+        try:
+            placements, summary = plan_cohort(conn.cursor(), students, args.top_k or 20)
+        finally:
+            conn.close()
+        for placement in placements:
+            print(json.dumps(placement))
+        print(json.dumps(summary), file=sys.stderr)
+        return
+
+    parsed = [parse_request({"top_k": args.top_k or None, **request}) for request in requests]
+    if args.workers > 1:
+        # Parse the catalog once into shared memory; every worker process attaches to it
+        from concurrent.futures import ProcessPoolExecutor
+        from shared_catalog import SharedCatalog, init_worker, worker_generate_schedules
+        conn = catalog.connect(args.db)
+        shared = SharedCatalog.publish(conn.cursor())
+        conn.close()
+        try:
+            with ProcessPoolExecutor(args.workers, initializer=init_worker, initargs=(shared.name,)) as executor:
+                futures = [executor.submit(worker_generate_schedules, courses, preferences, blocks, None, top_k)
+                           for courses, preferences, blocks, top_k in parsed]
+                all_results = (future.result() for future in futures)
+                write_batch(requests, all_results)
+        finally:
+            shared.close()
+    else:
+        import main
+        conn = catalog.connect(args.db)
+        try:
+            cursor = conn.cursor()
+            all_results = (main.generate_schedules(cursor, courses, preferences, blocks, top_k=top_k)
+                           for courses, preferences, blocks, top_k in parsed)
+            write_batch(requests, all_results)
+        finally:
+            conn.close()
+
+def write_batch(requests, all_results):
+    """
+    One JSON line per request: its id, the number of schedules and the ranked schedules.
+    """
+    import json
+
+    import output
+    for number, (request, results) in enumerate(zip(requests, all_results), 1):
+        record = {"id": request.get("id", number), "count": len(results), "schedules": list(output.iter_records(results))}
+        print(json.dumps(record))
+
+def run_serve(args):
+    import service
+    service.serve(args.host, args.port, args.db, args.cache_size, args.verbose, args.profile, args.profile_every)
+
+def run_bench(args, extra):
+    import benchmark
+    if args.suite == "search":
+        benchmark.main(extra)
+        return
+    report = benchmark.run_startup(args.course or ("ENG-103", "PSY-103"), args.db, args.runs)
+    if not benchmark.print_startup_report(report, args.budget_ms):
+        sys.exit(1)
+
+def run_loadtest(args, extra):
+    import loadtest
+    loadtest.main(extra)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Course scheduler.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="clean the master schedule export and load the catalog database")
+    ingest.add_argument("file", nargs="?", default="sample_schedule_SP24_6.csv",
+                        help="raw .csv export, or a cleaned_* snapshot (.parquet, .arrow, .csv)")
+    ingest.add_argument("--db", default=DB_NAME)
+    ingest.add_argument("--precompute", action="store_true", help="precompute popular course bundles after the import")
+    ingest.add_argument("--bundle", action="append", metavar="COURSES",
+                        help="comma-separated bundle to precompute (repeatable; default: inferred from program codes)")
+
+    schedule = commands.add_parser("schedule", help="rank the schedules for one student (interactive without courses)")
+    schedule.add_argument("courses", nargs="*", help="requested courses; COURSE|COURSE for alternatives")
+    schedule.add_argument("--modality", action="append", metavar="COURSE=METHOD", help="preferred method (repeatable)")
+    schedule.add_argument("--unavailable", action="append", metavar="'Day H:MM AM-H:MM PM'",
+                          help="blocked time (repeatable), e.g. 'Mon 12:00 AM-10:00 AM'")
+    schedule.add_argument("--top-k", type=int, default=50, help="schedules to keep (0 = all)")
+    schedule.add_argument("--offset", type=int, default=0)
+    schedule.add_argument("--limit", type=int, default=None)
+    schedule.add_argument("--format", choices=["text", "jsonl", "csv"], default="text")
+    schedule.add_argument("--stats", action="store_true", help="print stage timings and search counters to stderr")
+    schedule.add_argument("--db", default=DB_NAME)
+
+    batch = commands.add_parser("batch", help="answer a file of requests (JSON lines, '-' for stdin)")
+    batch.add_argument("requests")
+    batch.add_argument("--workers", type=int, default=1, help="worker processes sharing the parsed catalog")
+    batch.add_argument("--cohort", action="store_true", help="place all requests together under the seat limits")
+    batch.add_argument("--top-k", type=int, default=50, help="schedules per request, or options per student (0 = all)")
+    batch.add_argument("--db", default=DB_NAME)
+
+    serve = commands.add_parser("serve", help="JSON scheduling service over HTTP")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--cache-size", type=int, default=256, help="cached results (0 = no cache)")
+    serve.add_argument("--verbose", action="store_true", help="log every request")
+    serve.add_argument("--profile", metavar="DIR", help="write cProfile and tracemalloc output per stage to DIR")
+    serve.add_argument("--profile-every", type=int, default=100, metavar="N", help="profile every Nth request")
+    serve.add_argument("--db", default=DB_NAME)
+
+    bench = commands.add_parser("bench", help="startup-time benchmark, or the search benchmark (benchmark.py)")
+    bench.add_argument("suite", nargs="?", choices=["startup", "search"], default="startup",
+                       help="search passes any further options to benchmark.py")
+    bench.add_argument("--runs", type=int, default=20, help="fresh processes per startup command")
+    bench.add_argument("--course", action="append", help="courses of the timed schedule command (repeatable)")
+    bench.add_argument("--budget-ms", type=float, default=None, help="fail when schedule startup exceeds this")
+    bench.add_argument("--db", default=DB_NAME)
+
+    # Options are parsed by loadtest.main (cli.py loadtest --help lists them)
+    commands.add_parser("loadtest", add_help=False, help="replay synthetic or recorded requests under load")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "loadtest":
+        run_loadtest(args, extra)
+        return
+    if extra and not (args.command == "bench" and args.suite == "search"):
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    if args.command == "bench":
+        run_bench(args, extra)
+        return
+    commands = {"ingest": run_ingest, "schedule": run_schedule, "batch": run_batch, "serve": run_serve}
+    try:
+        commands[args.command](args)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+if __name__ == "__main__":
+    main()
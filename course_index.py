@@ -0,0 +1,91 @@
+# In-memory index of the courses in the catalog, built with one query.
+# Course lookups, autocomplete and the input summary (user_input.py) read it instead of querying the
+# database for every typed course. Rebuild it when the catalog changes (see catalog.get_catalog_version).
+from bisect import bisect_left
+
+from catalog import COURSE_INDEX_QUERY
+
+class CourseInfo:
+    """
+    What course selection needs to know about one course.
+    """
+    __slots__ = ('name', 'title', 'modalities', 'open_sections', 'pending_sections', 'has_coreq', 'programs')
+
+    def __init__(self, name, title):
+        self.name = name
+        self.title = title
+        self.modalities = []  # methods with open sections (Status 'A', seats left), in catalog order
+        self.open_sections = 0
+        self.pending_sections = 0  # sections with Status 'P'
+        self.has_coreq = False
+        self.programs = set()  # Sec_Course_Types codes
+
+class CourseIndex:
+    """
+    Course name -> CourseInfo, plus a sorted name list for prefix search and subject / program code maps.
+    """
+    def __init__(self, courses):
+        self.courses = {course.name: course for course in courses}
+        self._names = sorted(self.courses)
+        self._subjects = {}
+        self._programs = {}
+        for course in courses:
+            self._subjects.setdefault(course.name.split('-')[0], []).append(course.name)
+            for program in course.programs:
+                self._programs.setdefault(program, []).append(course.name)
+
+    @classmethod
+    def from_cursor(cls, cursor):
+        """
+        Build the index from the schedule table in one pass.
+        """
+        cursor.execute(COURSE_INDEX_QUERY)
+        courses = {}
+        for name, title, method, status, avail_seats, coreqs, programs in cursor.fetchall():
+            course = courses.get(name)
+            if course is None:
+                course = courses[name] = CourseInfo(name, title)
+            if status == 'A' and avail_seats > 0:
+                course.open_sections += 1
+                if method not in course.modalities:
+                    course.modalities.append(method)
+            elif status == 'P':
+                course.pending_sections += 1
+            if coreqs:
+                course.has_coreq = True
+            for code in (programs or '').split(','):
+                code = code.strip()
+                if code and code != 'nan':  # missing codes are the 'nan' string (generate_db.adjust_data_types)
+                    course.programs.add(code)
+        return cls(list(courses.values()))
+
+    def __contains__(self, course_name):
+        return course_name in self.courses
+
+    def get(self, course_name):
+        return self.courses.get(course_name)
+
+    def available_modalities(self, course_name):
+        course = self.courses.get(course_name)
+        return list(course.modalities) if course else []
+
+    def search(self, prefix, limit=None):
+        """
+        Course names starting with prefix (e.g. 'BIO', 'BIO-1'), in alphabetical order.
+        """
+        prefix = prefix.strip().upper()
+        matches = []
+        for name in self._names[bisect_left(self._names, prefix):]:
+            if not name.startswith(prefix) or (limit is not None and len(matches) >= limit):
+                break
+            matches.append(name)
+        return matches
+
+    def subject_courses(self, subject):
+        return list(self._subjects.get(subject.strip().upper(), []))
+
+    def program_courses(self, program):
+        """
+        Courses carrying a Sec_Course_Types code (e.g. GEHUM), in alphabetical order.
+        """
+        return sorted(self._programs.get(program.strip().upper(), []))
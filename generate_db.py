@@ -4,10 +4,26 @@ import pandas as pd
 import re
 import sqlite3
 import logging
+import os
 import sys
+import time
+import json
+from array import array
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from bundles import BUNDLE_TABLE, bundle_key
+from catalog import get_catalog_version
+from main import default_config, open_session
+from session import parse_minutes
+
+# Columns typed by adjust_data_types; missing text becomes the 'nan' string
+STRING_COLUMNS = [
+    'Sub', 'Term', 'Dept', 'Name', 'Short_Title', 'Status', 'Mtg_Days', 'STime', 'ETime',
+    'Faculty_First', 'Faculty_Last', 'Petition_Y_N', 'Printed_Comments', 'Method', 'Type',
+    'Location', 'Room', 'Sec_Course_Types'
+]
+DATETIME_COLUMNS = ['Date_Run', 'Status_Date', 'SDate', 'EDate']
+# Text columns added by handle_multiple_entries and process_comments; '' means none
+DERIVED_TEXT_COLUMNS = ['STime_Extra', 'ETime_Extra', 'Course_Name', 'Corequisite', 'Meets_With', 'Restricted_section']
 
 def read_csv(file_name):
     try:
@@ -18,6 +34,32 @@ def read_csv(file_name):
         logging.error(f'Error reading {file_name}: {e}')
         sys.exit(1)
 
+def read_cleaned_catalog(file_name):
+    '''Reads an already cleaned catalog (Parquet, Arrow IPC/Feather or cleaned .csv) without re-running the cleanup steps.'''
+    extension = os.path.splitext(file_name)[1].lower()
+    try:
+        if extension == '.parquet':
+            df = pd.read_parquet(file_name)
+        elif extension in ('.arrow', '.feather'):
+            df = pd.read_feather(file_name)
+        else:
+            # Text columns are read as written: 'nan' is the placeholder the scheduler checks for and '' is an
+            # empty value. Only empty fields of the other columns are missing values (NaN), as in the Parquet copy.
+            text_columns = STRING_COLUMNS + DERIVED_TEXT_COLUMNS
+            columns = pd.read_csv(file_name, nrows=0).columns
+            df = pd.read_csv(
+                file_name, keep_default_na=False,
+                na_values={col: [''] for col in columns if col not in text_columns},
+                dtype={col: str for col in text_columns if col in columns},
+            )
+            for col in DATETIME_COLUMNS:
+                df[col] = pd.to_datetime(df[col])
+        logging.info(f'Successfully read cleaned catalog {file_name}')
+        return df
+    except Exception as e:
+        logging.error(f'Error reading cleaned catalog {file_name}: {e}')
+        sys.exit(1)
+
 def clean_column_names(df):
     df.columns = df.columns.str.strip().str.replace(' ', '_').str.replace(r'[^\w]', '_', regex=True)
     df = df.rename(columns={'__Weeks': 'Number_Weeks'})
@@ -27,16 +69,10 @@ def clean_column_names(df):
 def adjust_data_types(df):
     # 'Name' is the section identifier (e.g., ENG-103-101), not the course identifier (e.g., ENG-103)
     # Course identifier is 'Course_Name'
-    string_columns = [
-        'Sub', 'Term', 'Dept', 'Name', 'Short_Title', 'Status', 'Mtg_Days', 'STime', 'ETime',
-        'Faculty_First', 'Faculty_Last', 'Petition_Y_N', 'Printed_Comments', 'Method', 'Type',
-        'Location', 'Room', 'Sec_Course_Types'
-    ]
-    for col in string_columns:
+    for col in STRING_COLUMNS:
         df[col] = df[col].astype(str).str.strip()
 
-    datetime_columns = ['Date_Run', 'Status_Date', 'SDate', 'EDate']
-    for col in datetime_columns:
+    for col in DATETIME_COLUMNS:
         df[col] = pd.to_datetime(df[col])
 
     logging.info('Data types adjusted')
@@ -113,11 +149,27 @@ def process_comments(df):
     logging.info('Extracted information from comments')
     return df
 
+def cleaned_name(file_name):
+    '''Name of the cleaned copy of an export, next to it: data/x.csv -> data/cleaned_x.csv'''
+    return os.path.join(os.path.dirname(file_name), 'cleaned_' + os.path.basename(file_name))
+
 def save_to_csv(df, file_name):
-    cleaned_file_name = 'cleaned_' + file_name
+    cleaned_file_name = cleaned_name(file_name)
     df.to_csv(cleaned_file_name, index=False)
     logging.info(f'Cleaned data saved to {cleaned_file_name}')
 
+def save_to_parquet(df, file_name):
+    '''Columnar copy of the cleaned data: keeps dtypes (datetimes, Cohort as bool) and loads much faster than the .csv.'''
+    cleaned_file_name = os.path.splitext(cleaned_name(file_name))[0] + '.parquet'
+    try:
+        df.to_parquet(cleaned_file_name, index=False)
+    except ImportError as e:
+        # pyarrow (or fastparquet) is optional; the .csv output is still written
+        logging.warning(f'Skipping Parquet output, no Parquet engine installed: {e}')
+        return None
+    logging.info(f'Cleaned data saved to {cleaned_file_name}')
+    return cleaned_file_name
+
 def import_to_sqlite(df, db_name):
     try:
         conn = sqlite3.connect(db_name)
@@ -131,6 +183,12 @@ def import_to_sqlite(df, db_name):
         cursor.execute("CREATE INDEX idx_avail_seats ON schedule (Avail_Seats)")
         cursor.execute("CREATE INDEX idx_faculty_last ON schedule (Faculty_Last)")
 
+        # Stamp the catalog version so cached schedule results from an older load are never reused
+        cursor.execute(f"PRAGMA user_version = {int(time.time())}")
+        conn.commit()
+        # WAL lets the read-only connections of catalog.CatalogPool keep reading during the next reload
+        cursor.execute("PRAGMA journal_mode = WAL")
+
         cursor.execute("PRAGMA table_info(schedule)")
         columns_info = cursor.fetchall()
         for column in columns_info:
@@ -141,17 +199,97 @@ def import_to_sqlite(df, db_name):
         logging.error(f'Error importing data to SQLite: {e}')
         sys.exit(1)
 
-def main():
-    file_name = 'sample_schedule_SP24_6.csv'
-    db_name = 'schedule.db'
+def infer_bundles(cursor, max_courses=5):
+    '''Course bundles from the Sec_Course_Types program codes: the open courses of each code with 2 to max_courses of them (companion labs come in as corequisites)'''
+    cursor.execute("SELECT DISTINCT Course_Name, Sec_Course_Types FROM schedule WHERE Status = 'A' AND Avail_Seats > 0")
+    programs = {}
+    for course, codes in cursor.fetchall():
+        for code in (codes or '').split(','):
+            code = code.strip()
+            if code and code != 'nan':
+                programs.setdefault(code, set()).add(course)
+
+    bundles = {}
+    for code, courses in sorted(programs.items()):
+        courses = sorted(course for course in courses if not (course.endswith('L') and course[:-1] in courses))
+        if 2 <= len(courses) <= max_courses:
+            bundles.setdefault(bundle_key(courses), courses)
+    return list(bundles.values())
+
+def precompute_bundles(db_name, bundles=None, max_schedules=200000):
+    '''Optional post-ingest stage: store the conflict-free class combinations of each bundle (inferred from the program codes if not given) for main.open_session'''
+    try:
+        conn = sqlite3.connect(db_name)
+        cursor = conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {BUNDLE_TABLE}")
+        cursor.execute(f"""
+            CREATE TABLE {BUNDLE_TABLE} (
+                bundle TEXT PRIMARY KEY, catalog_version INTEGER, courses TEXT, classes TEXT, count INTEGER, gap_config TEXT,
+                schedules BLOB, class_masks BLOB, profiles TEXT, profile_masks BLOB
+            )
+        """)
+        catalog_version = get_catalog_version(cursor)
+        # Gap scores are stored for the default gap settings; requests with other settings search as usual
+        gap_weights = default_config({})["gap_weights"]
+        gap_config = (parse_minutes(gap_weights["mandatory_break_start"]), parse_minutes(gap_weights["mandatory_break_end"]), gap_weights["max_allowed_gap"])
+        if bundles is None:
+            bundles = infer_bundles(cursor)
+
+        for courses in bundles:
+            session = open_session(cursor, courses)
+            combinations = session.feasible_combinations()
+            if len(combinations) > max_schedules:
+                logging.warning(f'Skipping bundle {courses}: {len(combinations)} class combinations')
+                continue
+            # Classes as the section names of their member options, combinations as class positions per slot
+            classes = [
+                [[[session.sections[index]["Name"] for index in option] for option in section_class.members] for section_class in slot_classes]
+                for slot_classes in session.classes
+            ]
+            schedules = array('H', [position for combination in combinations for position in combination])
+            # Per class and per (campus days, gap score) profile, the combinations as a bitmask (bit i = combination i)
+            mask_size = (len(combinations) + 7) // 8
+            class_masks = [[bytearray(mask_size) for _ in slot_classes] for slot_classes in session.classes]
+            buckets = {}
+            for row, combination in enumerate(combinations):
+                for slot, position in enumerate(combination):
+                    class_masks[slot][position][row >> 3] |= 1 << (row & 7)
+                classes_by_slot = [session.classes[slot][position] for slot, position in enumerate(combination)]
+                profile = session.combination_profile(classes_by_slot, *gap_config)
+                buckets.setdefault(profile, bytearray(mask_size))[row >> 3] |= 1 << (row & 7)
+            masks = b''.join(bytes(mask) for slot_masks in class_masks for mask in slot_masks)
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {BUNDLE_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (bundle_key(courses), catalog_version, json.dumps(courses), json.dumps(classes), len(combinations), json.dumps(gap_config),
+                 schedules.tobytes(), masks, json.dumps(list(buckets)), b''.join(bytes(mask) for mask in buckets.values()))
+            )
+            logging.info(f'Precomputed {len(combinations)} class combinations for bundle {courses}')
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        logging.error(f'Error precomputing bundles: {e}')
+        sys.exit(1)
+
+def main(file_name='sample_schedule_SP24_6.csv', db_name='schedule.db', precompute=False, bundles=None):
+    '''Cleans the export and loads it into the database (also run by `python cli.py ingest`).'''
+    # precompute: also store the schedules of popular course bundles after the import
+    # bundles: e.g. [['ENG-103', 'PSY-103', 'MAT-143']]; None infers them from the program codes
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-    df = read_csv(file_name)
-    df = clean_column_names(df)
-    df = adjust_data_types(df)
-    df = handle_multiple_entries(df)
-    df = process_comments(df)
-    save_to_csv(df, file_name)
+    if os.path.basename(file_name).startswith('cleaned_'):
+        # Re-import a previously cleaned snapshot (e.g. the .parquet copied to a worker host)
+        df = read_cleaned_catalog(file_name)
+    else:
+        df = read_csv(file_name)
+        df = clean_column_names(df)
+        df = adjust_data_types(df)
+        df = handle_multiple_entries(df)
+        df = process_comments(df)
+        save_to_csv(df, file_name)
+        save_to_parquet(df, file_name)
     import_to_sqlite(df, db_name)
+    if precompute:
+        precompute_bundles(db_name, bundles)
     logging.info('Script completed successfully')
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+class PipelineStats:
+    """
+    Per-stage timings and search counters for one run of the scheduling pipeline.
+    Pass an instance to main.generate_schedules (or main.main) to collect them; nothing is recorded otherwise.
+
+    Stages: retrieval, coreqs, validation (unavailability filter), enumeration (search, including the score of
+    every complete schedule it reaches), scoring (ranking and expanding the results) and output.
+    Search counters are counted per equivalence class of sections, see session.SectionClass.
+    With a profiling.StageProfiler as profiler, each stage is also profiled when the request is sampled; the
+    timings of a sampled request still include the tracing overhead, but not the snapshots and files.
+    """
+    def __init__(self, on_report=None, profiler=None):
+        self.stages = {}
+        self.counters = {
+            "partial_schedules_explored": 0,
+            "pruned_intrinsic": 0,
+            "pruned_extrinsic": 0,
+            "pruned_bound": 0,
+            "valid_schedules": 0,
+            "emitted_schedules": 0,
+        }
+        self.candidates_per_course = {}
+        self.on_report = on_report  # callback hook, called with the report dict
+        self.profiler = profiler
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time a pipeline stage (wall and CPU seconds). Repeated stages accumulate.
+        The timers run inside the profiler's context, so its snapshots and files are not counted in the stage.
+        """
+        profile = self.profiler.stage(name) if self.profiler is not None else nullcontext()
+        with profile:
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            try:
+                yield self
+            finally:
+                timing = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0, "calls": 0})
+                timing["wall"] += time.perf_counter() - wall_start
+                timing["cpu"] += time.process_time() - cpu_start
+                timing["calls"] += 1
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def to_dict(self):
+        return {
+            "stages": self.stages,
+            "total_wall": sum(timing["wall"] for timing in self.stages.values()),
+            "total_cpu": sum(timing["cpu"] for timing in self.stages.values()),
+            "counters": self.counters,
+            "candidates_per_course": self.candidates_per_course,
+        }
+
+    def report(self, path=None):
+        """
+        Emit the report: write it as JSON to path (if given) and pass it to the on_report callback (if set).
+        """
+        report = self.to_dict()
+        if path:
+            with open(path, 'w') as report_file:
+                json.dump(report, report_file, indent=2)
+        if self.on_report:
+            self.on_report(report)
+        return report
+
+    def format_summary(self):
+        """
+        Human-readable performance summary.
+        """
+        lines = ["--- Performance Summary ---"]
+        for name, timing in self.stages.items():
+            lines.append(f"{name:<12} wall {timing['wall']:.3f} s, cpu {timing['cpu']:.3f} s")
+        report = self.to_dict()
+        lines.append(f"{'total':<12} wall {report['total_wall']:.3f} s, cpu {report['total_cpu']:.3f} s")
+        for course, candidates in self.candidates_per_course.items():
+            lines.append(f"candidates for {course}: {candidates}")
+        for name, value in self.counters.items():
+            lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+
+def stage(stats, name):
+    """
+    stats.stage(name), or a no-op context when stats is None.
+    """
+    return stats.stage(name) if stats is not None else nullcontext()
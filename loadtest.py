@@ -0,0 +1,435 @@
+# Registration-day load test of the scheduler, offline on one machine.
+# Replays synthetic student requests (drawn from the catalog: popular courses, program bundles, alternatives,
+# availability profiles) or recorded ones (JSON lines in the POST /schedules format) against either entry point:
+#   direct   main.generate_schedules on a thread pool, one CatalogPool connection per thread
+#   service  the HTTP service: a local `cli.py serve` started for the run, or an already running one (--url)
+# With --rate, requests arrive open-loop (Poisson) and latency counts from the scheduled arrival, so time spent
+# queueing behind a saturated scheduler shows up in the percentiles; --rate 0 runs --concurrency closed-loop
+# clients instead. Every --interval seconds it prints throughput, p50/p95/p99 latency, errors and the RSS of the
+# process doing the scheduling.
+# Usage: python loadtest.py --target service --rate 40 --concurrency 16 --duration 120 --output report.json
+#        python cli.py loadtest --target direct --requests recorded.jsonl --rate 0 --concurrency 4
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from benchmark import CLI_PATH, availability_blocks
+from catalog import DB_NAME, CatalogPool, connect
+from cli import read_requests
+from course_index import CourseIndex
+from main import generate_schedules
+from schedule_cache import ScheduleCache, cached_generate_schedules
+from service import parse_request
+
+# Availability of synthetic students, as (share, unavailability blocks)
+AVAILABILITY_PROFILES = [
+    (0.20, {}),  # available any time
+    (0.30, availability_blocks('08:00 AM', '03:00 PM', days_off=('Sat',))),  # daytime
+    (0.15, availability_blocks('04:00 PM', '10:00 PM')),  # evenings, after work
+    (0.15, availability_blocks('08:00 AM', '09:00 PM', days_off=('Tue', 'Thu', 'Sat'))),
+    (0.10, availability_blocks('08:00 AM', '09:00 PM', days_off=('Mon', 'Wed', 'Fri', 'Sat'))),
+    (0.10, availability_blocks('10:00 AM', '02:00 PM')),  # narrow window
+]
+
+# Number of requested courses per synthetic student, as share of the students
+COURSE_COUNTS = {2: 0.15, 3: 0.30, 4: 0.30, 5: 0.20, 6: 0.05}
+
+def synthetic_requests(cursor, count, top_k=50, seed=0, bundle_share=0.25, alternative_share=0.1, preference_share=0.3):
+    """
+    Student requests shaped like the catalog: courses are drawn by their number of open sections, a share of the
+    students asks for a program bundle (a Sec_Course_Types code with 2 to 6 open courses), some slots accept an
+    alternative course of the same subject, and some courses get a modality preference.
+    """
+    index = CourseIndex.from_cursor(cursor)
+    rng = random.Random(seed)
+    open_courses = [course for course in index.courses.values() if course.open_sections]
+    weights = [course.open_sections for course in open_courses]
+    programs = sorted({program for course in open_courses for program in course.programs})
+    bundles = []
+    for program in programs:
+        names = [name for name in index.program_courses(program) if index.get(name).open_sections]
+        if 2 <= len(names) <= 6:
+            bundles.append(names)
+    by_subject = {}
+    for course in open_courses:
+        by_subject.setdefault(course.name.split('-')[0], []).append(course.name)
+    profile_weights, profiles = zip(*AVAILABILITY_PROFILES)
+    # Blocks as JSON lists, the shape service.parse_request accepts (and that --record writes)
+    profiles = [{day: [list(block) for block in blocks] for day, blocks in profile.items()} for profile in profiles]
+
+    requests = []
+    for number in range(1, count + 1):
+        if bundles and rng.random() < bundle_share:
+            names = list(rng.choice(bundles))
+        else:
+            size = min(rng.choices(list(COURSE_COUNTS), list(COURSE_COUNTS.values()))[0], len(open_courses))
+            names = []
+            while len(names) < size:
+                name = rng.choices(open_courses, weights)[0].name
+                if name not in names:
+                    names.append(name)
+        courses = []
+        for name in names:
+            alternatives = [other for other in by_subject[name.split('-')[0]] if other not in names]
+            if alternatives and rng.random() < alternative_share:
+                courses.append([name, rng.choice(alternatives)])
+            else:
+                courses.append(name)
+        requests.append({
+            "id": number,
+            "courses": courses,
+            "modality_preferences": {name: rng.choice(index.available_modalities(name))
+                                     for name in names if rng.random() < preference_share},
+            "unavailability_blocks": rng.choices(profiles, profile_weights)[0],
+            "top_k": top_k,
+        })
+    return requests
+
+def rss_kb(pid):
+    """
+    Resident set size of a process from /proc (None where unavailable).
+    """
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def percentile(sorted_values, p):
+    """
+    Nearest-rank percentile of sorted values (None when empty).
+    """
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(p / 100 * len(sorted_values)) - 1))]
+
+class RequestFailed(Exception):
+    pass
+
+class DirectTarget:
+    """
+    The programmatic entry point, in this process.
+    """
+    name = "direct"
+
+    def __init__(self, db_name=DB_NAME, cache_size=0):
+        self.pool = CatalogPool(db_name)
+        self.cache = ScheduleCache(cache_size) if cache_size else None
+        self.pid = os.getpid()
+
+    def send(self, request):
+        selected_courses, modality_preferences, unavailability_blocks, top_k = parse_request(request)
+        cursor = self.pool.cursor()
+        if self.cache is not None:
+            cached_generate_schedules(self.cache, cursor, selected_courses, modality_preferences, unavailability_blocks,
+                                      top_k=top_k)
+        else:
+            generate_schedules(cursor, selected_courses, modality_preferences, unavailability_blocks, top_k=top_k)
+
+    def close(self):
+        self.pool.close()
+
+class ServiceTarget:
+    """
+    The HTTP service: POST /schedules over one keep-alive connection per client thread.
+    pid is the server process whose memory is sampled (None: not sampled).
+    """
+    name = "service"
+
+    def __init__(self, url, pid=None, process=None):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.pid = pid
+        self.process = process  # the local server started by start(), stopped by close()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    @classmethod
+    def start(cls, db_name=DB_NAME, cache_size=256, timeout=10.0):
+        """
+        Start `cli.py serve` on a free local port and wait until it answers /health.
+        """
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        process = subprocess.Popen([sys.executable, CLI_PATH, "serve", "--port", str(port), "--db", db_name,
+                                    "--cache-size", str(cache_size)], stdout=subprocess.DEVNULL)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                conn.request("GET", "/health")
+                conn.getresponse().read()
+                conn.close()
+                return cls(f"http://127.0.0.1:{port}", process.pid, process)
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    process.kill()
+                    raise RuntimeError("the scheduling service did not start")
+                time.sleep(0.05)
+
+    def send(self, request):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            with self._lock:
+                self._connections.append(conn)
+        try:
+            conn.request("POST", "/schedules", json.dumps(request), {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self._local.conn = None  # reconnect on the next request
+            raise
+        if response.status != 200:
+            raise RequestFailed(f"HTTP {response.status}")
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait()
+
+class LoadStats:
+    """
+    Latencies and errors of completed requests, for the whole run and for the current report interval.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = []
+        self.errors = Counter()
+        self.dropped = 0
+        self._window_latencies = []
+        self._window_errors = 0
+
+    def record(self, latency, error=None):
+        with self._lock:
+            if error is None:
+                self.latencies.append(latency)
+                self._window_latencies.append(latency)
+            else:
+                self.errors[error] += 1
+                self._window_errors += 1
+
+    def drop(self):
+        with self._lock:
+            self.dropped += 1
+            self._window_errors += 1
+
+    def take_window(self):
+        with self._lock:
+            window = (self._window_latencies, self._window_errors)
+            self._window_latencies, self._window_errors = [], 0
+        return window
+
+def latency_summary(latencies):
+    ordered = sorted(latencies)
+    return {f"p{p}_ms": round(percentile(ordered, p) * 1000, 2) if ordered else None for p in (50, 95, 99)}
+
+def run_load(target, requests, rate=10.0, concurrency=8, duration=30.0, max_requests=None, interval=5.0, seed=0,
+             max_pending=None, out=None):
+    """
+    Replay requests (cycling through them) against target for duration seconds or max_requests requests.
+    rate: open-loop arrivals per second (Poisson); 0 runs `concurrency` closed-loop clients back to back.
+    max_pending: open-loop requests waiting or running at most (default 100 per client); arrivals beyond it are
+    dropped and counted as errors, so an overloaded target cannot make the generator itself grow without bound.
+    Returns the report: parameters, one timeline entry per interval and the summary.
+    """
+    out = out or sys.stdout
+    stats = LoadStats()
+    rng = random.Random(seed)
+    max_pending = max_pending or concurrency * 100
+    pending = [0]
+    pending_lock = threading.Lock()
+    issued = [0]
+    done = threading.Event()
+    timeline = []
+
+    def execute(request, scheduled):
+        try:
+            target.send(request)
+        except RequestFailed as e:
+            stats.record(None, str(e))
+        except Exception as e:
+            stats.record(None, type(e).__name__)
+        else:
+            stats.record(time.perf_counter() - scheduled)
+        finally:
+            with pending_lock:
+                pending[0] -= 1
+
+    def next_request():
+        with pending_lock:
+            if max_requests is not None and issued[0] >= max_requests:
+                return None
+            request = requests[issued[0] % len(requests)]
+            issued[0] += 1
+            pending[0] += 1
+            return request
+
+    def client(deadline):
+        while time.perf_counter() < deadline:
+            request = next_request()
+            if request is None:
+                return
+            execute(request, time.perf_counter())
+
+    rss_start = rss_kb(target.pid) if target.pid else None
+
+    def report(elapsed, seconds):
+        latencies, errors = stats.take_window()
+        rss = rss_kb(target.pid) if target.pid else None
+        entry = {
+            "elapsed": round(elapsed, 2),
+            "completed": len(latencies),
+            "throughput": round(len(latencies) / seconds, 2) if seconds else 0.0,
+            **latency_summary(latencies),
+            "errors": errors,
+            "in_flight": pending[0],
+            "rss_mb": round(rss / 1024, 1) if rss is not None else None,
+        }
+        timeline.append(entry)
+        print(f"{entry['elapsed']:>8} {entry['completed']:>9} {entry['throughput']:>8} {entry['p50_ms'] or '-':>9} "
+              f"{entry['p95_ms'] or '-':>9} {entry['p99_ms'] or '-':>9} {entry['errors']:>7} {entry['in_flight']:>9} "
+              f"{entry['rss_mb'] or '-':>8}", file=out)
+
+    def reporter(start):
+        last = start
+        while not done.wait(max(0.0, last + interval - time.perf_counter())):
+            now = time.perf_counter()
+            report(now - start, now - last)
+            last = now
+        now = time.perf_counter()
+        if now - last > interval / 10:
+            report(now - start, now - last)
+
+    print(f"{'elapsed':>8} {'completed':>9} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} "
+          f"{'in flight':>9} {'RSS MB':>8}", file=out)
+    start = time.perf_counter()
+    deadline = start + duration
+    reporter_thread = threading.Thread(target=reporter, args=(start,), daemon=True)
+    reporter_thread.start()
+    with ThreadPoolExecutor(concurrency) as executor:
+        if rate > 0:
+            arrival = start
+            while arrival < deadline:
+                now = time.perf_counter()
+                if arrival > now:
+                    time.sleep(arrival - now)
+                if pending[0] >= max_pending:
+                    stats.drop()
+                else:
+                    request = next_request()
+                    if request is None:
+                        break
+                    executor.submit(execute, request, arrival)
+                arrival += rng.expovariate(rate)
+        else:
+            for _ in range(concurrency):
+                executor.submit(client, deadline)
+    elapsed = time.perf_counter() - start
+    done.set()
+    reporter_thread.join()
+
+    rss_samples = [entry["rss_mb"] for entry in timeline if entry["rss_mb"] is not None]
+    rss_start_mb = round(rss_start / 1024, 1) if rss_start is not None else None
+    summary = {
+        "seconds": round(elapsed, 2),
+        "completed": len(stats.latencies),
+        "throughput": round(len(stats.latencies) / elapsed, 2),
+        **latency_summary(stats.latencies),
+        "errors": sum(stats.errors.values()) + stats.dropped,
+        "error_types": dict(stats.errors, **({"dropped": stats.dropped} if stats.dropped else {})),
+        "rss_start_mb": rss_start_mb,
+        "rss_end_mb": rss_samples[-1] if rss_samples else None,
+        "rss_peak_mb": max(rss_samples) if rss_samples else None,
+        "rss_growth_mb": round(rss_samples[-1] - rss_start_mb, 1) if rss_samples and rss_start_mb is not None else None,
+    }
+    params = {
+        "target": target.name, "rate": rate, "concurrency": concurrency, "duration": duration,
+        "max_requests": max_requests, "distinct_requests": len(requests), "seed": seed,
+    }
+    return {"params": params, "timeline": timeline, "summary": summary}
+
+def print_summary(report, out=None):
+    out = out or sys.stdout
+    summary = report["summary"]
+    print(f"\n{summary['completed']} requests in {summary['seconds']} s: {summary['throughput']} req/s, "
+          f"p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms, p99 {summary['p99_ms']} ms", file=out)
+    print(f"errors: {summary['errors']}" + (f" {summary['error_types']}" if summary['errors'] else ""), file=out)
+    if summary["rss_start_mb"] is not None:
+        print(f"memory (RSS): {summary['rss_start_mb']} MB at start, {summary['rss_end_mb']} MB at end, "
+              f"peak {summary['rss_peak_mb']} MB, growth {summary['rss_growth_mb']} MB", file=out)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="loadtest.py", description="Load test the scheduler with student requests.")
+    parser.add_argument("--target", choices=["direct", "service"], default="direct")
+    parser.add_argument("--url", help="running service to test (default: start a local `cli.py serve`)")
+    parser.add_argument("--server-pid", type=int, help="process of the --url service, for memory sampling")
+    parser.add_argument("--db", default=DB_NAME)
+    parser.add_argument("--cache-size", type=int, default=None,
+                        help="result cache of the target (default: none in process, 256 for the local service)")
+    parser.add_argument("--requests", help="recorded requests to replay (JSON lines or a JSON list, '-' for stdin)")
+    parser.add_argument("--synthetic", type=int, default=500, help="distinct synthetic requests, without --requests")
+    parser.add_argument("--top-k", type=int, default=50, help="top_k of synthetic requests (0 = all)")
+    parser.add_argument("--record", help="write the synthetic requests to this JSON lines file, for replay")
+    parser.add_argument("--rate", type=float, default=10.0, help="arrivals per second (0 = closed loop)")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in progress at most")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--max-requests", type=int, help="stop after this many requests")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between report lines")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report (timeline and summary) as JSON")
+    args = parser.parse_args(argv)
+
+    if args.requests:
+        requests = read_requests(args.requests)
+    else:
+        conn = connect(args.db)
+        requests = synthetic_requests(conn.cursor(), args.synthetic, args.top_k or None, args.seed)
+        conn.close()
+        if args.record:
+            with open(args.record, 'w') as record_file:
+                for request in requests:
+                    record_file.write(json.dumps(request) + "\n")
+    if not requests:
+        parser.error("no requests to replay")
+
+    if args.target == "direct":
+        target = DirectTarget(args.db, args.cache_size or 0)
+    elif args.url:
+        target = ServiceTarget(args.url, args.server_pid)
+    else:
+        target = ServiceTarget.start(args.db, 256 if args.cache_size is None else args.cache_size)
+    try:
+        report = run_load(target, requests, args.rate, args.concurrency, args.duration, args.max_requests,
+                          args.interval, args.seed)
+    finally:
+        target.close()
+    print_summary(report)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+
+if __name__ == "__main__":
+    main()
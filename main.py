@@ -1,6 +1,13 @@
-import sqlite3
-from datetime import datetime
-from itertools import permutations
+import sys
+from contextlib import nullcontext
+
+import catalog
+from availability import get_availability
+from bundles import load_precomputed
+from instrumentation import stage
+from output import write_text
+from session import ScheduleSession, flatten_courses
+from user_input import get_course_names
 
 def retrieve_section_info(cursor, selected_courses):
     """
@@ -9,11 +16,7 @@ def retrieve_section_info(cursor, selected_courses):
     sections_info = {}
     section_columns = []
     for course in selected_courses:
-        cursor.execute("""
-            SELECT Name, Avail_Seats, Printed_Comments, Corequisite, STime, ETime, SDate, EDate, Mtg_Days, Method, Credits, Restricted_Section, Cohort
-            FROM schedule
-            WHERE Course_Name = ? AND Status = 'A' AND Avail_Seats > 0
-        """, (course,))
+        cursor.execute(catalog.COURSE_SECTIONS_QUERY, (course,))
         sections = cursor.fetchall()
         if not section_columns:
             section_columns = [desc[0] for desc in cursor.description]
@@ -40,11 +43,7 @@ def process_corequisites(cursor, sections_info, section_columns):
                     specific_coreqs = []
                     for coreq in coreq_list:
                         coreq = coreq.strip()
-                        cursor.execute("""
-                            SELECT Name, Avail_Seats, Printed_Comments, Corequisite, STime, ETime, SDate, EDate, Mtg_Days, Method, Restricted_Section, Cohort
-                            FROM schedule
-                            WHERE Name = ? AND Status = 'A' AND Avail_Seats > 0
-                        """, (coreq,))
+                        cursor.execute(catalog.SECTION_QUERY, (coreq,))
                         coreq_section = cursor.fetchone()
                         if coreq_section:
                             coreq_section = dict(zip(section_columns, coreq_section))
@@ -57,297 +56,92 @@ def process_corequisites(cursor, sections_info, section_columns):
 
     return updated_sections_info, all_sections
 
-def generate_combinations(sections_info):
-    """
-    Generate all possible combinations of sections without considering corequisites.
-    """
-    valid_combinations = []
-    course_list = list(sections_info.keys())
-
-    def is_valid_combination(combination):
-        scheduled_courses = set()
-
-        for section, coreqs in combination:
-            course_name = '-'.join(section["Name"].split('-')[:2])
-            if course_name in scheduled_courses:
-                return False
-            scheduled_courses.add(course_name)
-
-        return len(scheduled_courses) == len(course_list)
-
-    for course_perm in permutations(course_list):
-        for combination in permutations([section for course in course_perm for section in sections_info[course] if isinstance(section, tuple)], len(course_list)):
-            if is_valid_combination(combination):
-                valid_combinations.append(combination)
-    return valid_combinations
-
-def validate_combinations_with_coreqs(combinations_without_coreqs, sections_info, unavailability_blocks):
-    """
-    Validate the generated combinations considering corequisites and unavailability blocks.
-    """
-    valid_combinations = []
-
-    for combination in combinations_without_coreqs:
-        base_combination = [section[0] for section in combination]
-        additional_combinations = [[]]
-
-        for section, coreqs in combination:
-            if coreqs:
-                new_combinations = []
-                for coreq in coreqs:
-                    for combo in additional_combinations:
-                        new_combo = combo + [coreq]
-                        new_combinations.append(new_combo)
-                additional_combinations = new_combinations
-
-        for extra_combination in additional_combinations:
-            full_combination = base_combination + extra_combination
-            if is_valid_combination(full_combination, unavailability_blocks):
-                valid_combinations.append(full_combination)
-
-    return valid_combinations
-
-def is_valid_combination(combination, unavailability_blocks):
-    """
-    Check if a combination of sections is valid by ensuring there are no intrinsic or extrinsic conflicts.
-    """
-    scheduled_sections = []
-
-    for section in combination:
-        if has_intrinsic_conflict(scheduled_sections, section) or has_extrinsic_conflict(section, unavailability_blocks):
-            return False
-        scheduled_sections.append(section)
-
-    return True
-
-def has_intrinsic_conflict(scheduled_sections, new_section):
-    """
-    Check for conflicts between scheduled sections (intrinsic conflicts).
-    """
-    section_start = datetime.strptime(new_section["STime"], '%I:%M %p').time() if new_section["STime"] != 'nan' else None
-    section_end = datetime.strptime(new_section["ETime"], '%I:%M %p').time() if new_section["ETime"] != 'nan' else None
-    section_days = new_section["Mtg_Days"].split(', ') if new_section["Mtg_Days"] != 'nan' else []
-    section_start_date = datetime.strptime(new_section["SDate"], '%Y-%m-%d %H:%M:%S')
-    section_end_date = datetime.strptime(new_section["EDate"], '%Y-%m-%d %H:%M:%S')
-
-    if section_start and section_end:
-        for scheduled_section in scheduled_sections:
-            scheduled_start = datetime.strptime(scheduled_section["STime"], '%I:%M %p').time() if scheduled_section["STime"] != 'nan' else None
-            scheduled_end = datetime.strptime(scheduled_section["ETime"], '%I:%M %p').time() if scheduled_section["ETime"] != 'nan' else None
-            scheduled_days = scheduled_section["Mtg_Days"].split(', ') if scheduled_section["Mtg_Days"] != 'nan' else []
-            scheduled_start_date = datetime.strptime(scheduled_section["SDate"], '%Y-%m-%d %H:%M:%S')
-            scheduled_end_date = datetime.strptime(scheduled_section["EDate"], '%Y-%m-%d %H:%M:%S')
-
-            if (section_start_date <= scheduled_end_date and section_end_date >= scheduled_start_date):
-                if section_start and section_end and scheduled_start and scheduled_end:
-                    for day in section_days:
-                        if day in scheduled_days:
-                            if section_start < scheduled_end and section_end > scheduled_start:
-                                return True
-    return False
-
-def has_extrinsic_conflict(new_section, unavailability_blocks):
-    """
-    Check for conflicts between a section and unavailability blocks (extrinsic conflicts).
-    """
-    section_start = datetime.strptime(new_section["STime"], '%I:%M %p').time() if new_section["STime"] != 'nan' else None
-    section_end = datetime.strptime(new_section["ETime"], '%I:%M %p').time() if new_section["ETime"] != 'nan' else None
-    section_days = new_section["Mtg_Days"].split(', ') if new_section["Mtg_Days"] != 'nan' else []
-
-    day_map = {'M': 'Mon', 'T': 'Tue', 'W': 'Wed', 'TH': 'Thu', 'F': 'Fri', 'S': 'Sat'}
-
-    for day in section_days:
-        mapped_day = day_map.get(day)
-        if not mapped_day:
-            continue
-
-        if mapped_day in unavailability_blocks:
-            for block in unavailability_blocks[mapped_day]:
-                block_start = datetime.strptime(block[0], '%I:%M %p').time()
-                block_end = datetime.strptime(block[1], '%I:%M %p').time()
-
-                if section_start < block_end and section_end > block_start:
-                    return True
-
-    return False
-
-def score_gaps(combination, config):
-    """
-    Calculate the gap score for a given combination.
-    """
-    gap_score = 0
-    mandatory_break_start = datetime.strptime(config["gap_weights"]["mandatory_break_start"], '%I:%M %p').time()
-    mandatory_break_end = datetime.strptime(config["gap_weights"]["mandatory_break_end"], '%I:%M %p').time()
-    max_allowed_gap = config["gap_weights"]["max_allowed_gap"]
-
-    day_map = {'M': 'Mon', 'T': 'Tue', 'W': 'Wed', 'TH': 'Thu', 'F': 'Fri', 'S': 'Sat'}
-
-    for day in day_map.keys():
-        day_sections = [s for s in combination if day in s["Mtg_Days"]]
-        day_sections.sort(key=lambda s: datetime.strptime(s["STime"], '%I:%M %p').time() if s["STime"] != 'nan' else datetime.strptime('12:00 AM', '%I:%M %p').time())
-
-        for i in range(1, len(day_sections)):
-            prev_section = day_sections[i - 1]
-            curr_section = day_sections[i]
-
-            prev_end = datetime.strptime(prev_section["ETime"], '%I:%M %p').time() if prev_section["ETime"] != 'nan' else None
-            curr_start = datetime.strptime(curr_section["STime"], '%I:%M %p').time() if curr_section["STime"] != 'nan' else None
-
-            if prev_end and curr_start:
-                if day in ['M', 'W', 'F'] and prev_end <= mandatory_break_start and curr_start >= mandatory_break_end:
-                    continue  # Skip mandatory break gaps
-                gap_minutes = (datetime.combine(datetime.min, curr_start) - datetime.combine(datetime.min, prev_end)).seconds / 60
-                if gap_minutes > max_allowed_gap:
-                    gap_hours = round(gap_minutes / 60)
-                    gap_score += (gap_hours ** 2)
-
-    return gap_score
-
-def calculate_modality_score(combination, modality_preferences):
-    """
-    Calculate the score based on the modality preferences of the student.
-    """
-    modality_score = 0
-
-    for section in combination:
-        course_name = '-'.join(section["Name"].split('-')[:2])
-        section_modality = section["Method"]
-        preferred_modality = modality_preferences.get(course_name)
-
-        if preferred_modality and section_modality != preferred_modality:
-            modality_score += 1
-
-    return modality_score
-
-def calculate_days_on_campus(combination, day_weights):
+def print_summary(valid_combinations_with_scores, offset=0, limit=None):
     """
-    Calculate the score based on the number of days on campus.
+    Print the valid schedule combinations sorted by combined score.
+    Expects the ranked session.ScheduleResults returned by generate_schedules; offset and limit select a page.
     """
-    days_on_campus = set()
-    for section in combination:
-        if section["Method"] != "ONLIN":
-            days_on_campus.update(section["Mtg_Days"].split(', ') if section["Mtg_Days"] != 'nan' else [])
+    print("Generated valid schedule combinations:")
+    write_text(valid_combinations_with_scores, sys.stdout, offset, limit)
 
-    num_days = len(days_on_campus)
-    return day_weights.get(num_days, max(day_weights.values()))  # Return the weight for the number of days or the max weight if not defined
+    # Re-print top 50 combinations when everything was listed
+    if limit is None and offset == 0 and len(valid_combinations_with_scores) > 50:
+        print("Top 50 schedule combinations:")
+        write_text(valid_combinations_with_scores, sys.stdout, 0, 50)
 
-def combined_score(combination, config):
+def default_config(modality_preferences):
     """
-    Calculate the combined score for a combination based on modality, days, and gaps.
+    Build the default scoring configuration for the given modality preferences.
     """
-    modality_score = calculate_modality_score(combination, config["preferences"])
-    days_score = calculate_days_on_campus(combination, config["day_weights"])
-    gap_score = score_gaps(combination, config)
-
-    combined_score = (
-        config["weights"]["modality"] * modality_score +
-        config["weights"]["days"] * days_score +
-        config["weights"]["gaps"] * gap_score
-    )
-    return combined_score, modality_score, days_score, gap_score
+    return {
+        "weights": {  # how to weigh different scores vs each other (equal weight = 1 for everything)
+            "modality": 3,
+            "days": 1,
+            "gaps": 1
+        },
+        "preferences": modality_preferences, # 0 if section modality matches preferred modality; 1 penalty point if it does not
+        "day_weights": {1: 0, 2: 1, 3: 2, 4: 3, 5: 4},  # 1 day a week = no penalty; 2 days a week = 1 penalty point; etc.
+        "gap_weights": {
+            "mandatory_break_start": "12:15 PM",  # "mandatory break" is College Hour
+            "mandatory_break_end": "1:15 PM",
+            "max_allowed_gap": 20  # In minutes
+        }
+    }
 
-def sort_combination(combination):
+def open_session(cursor, selected_courses, stats=None):
     """
-    Sort the sections within a combination by the start time of their first meeting day.
+    Fetch the sections and corequisites of the selected courses once and build a reusable search session.
+    An entry of selected_courses may be a tuple of alternative courses, any one of which will do.
     """
-    # Define a mapping from days of the week to numbers
-    day_to_number = {'M': 0, 'T': 1, 'W': 2, 'TH': 3, 'F': 4, 'S': 5}
-
-    def sort_key(section):
-        # Check if the section is online
-        if section["Method"] == "ONLIN":
-            return (7, None)  # Online sections get assigned to 8th day of the week, so that they are printed last
-        # Extract the first meeting day and start time
-        first_day = section["Mtg_Days"].split(', ')[0] if section["Mtg_Days"] != 'nan' else 'nan'
-        day_number = day_to_number.get(first_day, 6)  # Use 6 for 'nan' to sort them after regular days
-        start_time = datetime.strptime(section["STime"], '%I:%M %p').time() if section["STime"] != 'nan' else datetime.strptime('12:00 AM', '%I:%M %p').time()
-        return (day_number, start_time)
-
-    # Sort the sections within each combination
-    return sorted(combination, key=sort_key)
+    with stage(stats, "retrieval"):
+        sections_info, section_columns = retrieve_section_info(cursor, flatten_courses(selected_courses))
+    with stage(stats, "coreqs"):
+        sections_info, all_sections = process_corequisites(cursor, sections_info, section_columns)
+        session = ScheduleSession(selected_courses, sections_info)
+        load_precomputed(cursor, session)  # popular bundles: stored combinations replace the search
+    return session
 
-def print_summary(valid_combinations_with_scores):
+def generate_schedules(cursor, selected_courses, modality_preferences, unavailability_blocks, config=None, top_k=None, stats=None):
     """
-    Print the valid schedule combinations sorted by combined score.
+    Run the scheduling pipeline for one request and return the scored combinations, best first.
+    If top_k is given, only the top_k best combinations are returned.
+    Pass an instrumentation.PipelineStats as stats to record per-stage timings and search counters.
     """
-    # Sort combinations by combined score first
-    valid_combinations_with_scores.sort(key=lambda x: x[1])
-
-    print("Generated valid schedule combinations:")
-    for i, (combination, combined_score, modality_score, days_score, gap_score) in enumerate(valid_combinations_with_scores, start=1):
-        sorted_combination = sort_combination(combination)
-        print(f"Option {i} (combined score = {combined_score}, modality score = {modality_score}, days score = {days_score}, gap score = {gap_score}):")
-        for section in sorted_combination:
-            section_name = section["Name"]
-            meeting_days = section["Mtg_Days"] if section["Mtg_Days"] != 'nan' else "Online"
-            meeting_times = f"{section['STime']} - {section['ETime']}" if section['STime'] != 'nan' and section['ETime'] != 'nan' else ""
-            print(f"  {section_name} ({meeting_days} {meeting_times})")
-        print()
+    if config is None:
+        config = default_config(modality_preferences)
 
-    # Re-print top 50 combinations
-    if len(valid_combinations_with_scores) > 50:
-        print("Top 50 schedule combinations:")
-        for i, (combination, combined_score, modality_score, days_score, gap_score) in enumerate(valid_combinations_with_scores[:50], start=1):
-            sorted_combination = sort_combination(combination)
-            print(f"Option {i} (combined score = {combined_score}, modality score = {modality_score}, days score = {days_score}, gap score = {gap_score}):")
-            for section in sorted_combination:
-                section_name = section["Name"]
-                meeting_days = section["Mtg_Days"] if section["Mtg_Days"] != 'nan' else "Online"
-                meeting_times = f"{section['STime']} - {section['ETime']}" if section['STime'] != 'nan' and section['ETime'] != 'nan' else ""
-                print(f"  {section_name} ({meeting_days} {meeting_times})")
-            print()
+    session = open_session(cursor, selected_courses, stats)
+    valid_combinations_with_scores = session.run(unavailability_blocks, config, top_k, stats)
+    return valid_combinations_with_scores
 
-def main():
+def main(stats=None, report_path=None):
     """
     Main function to run the schedule generator.
+    With stats (an instrumentation.PipelineStats), the run is instrumented and its report is emitted at the end;
+    report_path additionally writes the report as JSON. If stats has a profiler, the run is also profiled.
     """
-    conn = sqlite3.connect('schedule.db')
+    conn = catalog.connect()
     cursor = conn.cursor()
 
     # Use the courses selected in user_input.py
-    from user_input import get_course_names
-
     selected_courses, unavailable_courses, modality_preferences = get_course_names(cursor, 8)
 
     # Process availability
-    from availability import get_availability
-
     availability, unavailability_blocks = get_availability()
 
-    # Retrieve section info
-    sections_info, section_columns = retrieve_section_info(cursor, selected_courses)
-    sections_info, all_sections = process_corequisites(cursor, sections_info, section_columns)
-
-    # Generate combinations without corequisites
-    combinations_without_coreqs = generate_combinations(sections_info)
+    profiler = stats.profiler if stats is not None else None
+    with (profiler.request() if profiler is not None else nullcontext()):
+        valid_combinations_with_scores = generate_schedules(cursor, selected_courses, modality_preferences, unavailability_blocks, stats=stats)
 
-    # Validate combinations with corequisites
-    valid_combinations = validate_combinations_with_coreqs(combinations_without_coreqs, sections_info, unavailability_blocks)
-
-    # Define configuration for scoring
-    config = {
-        "weights": {  # how to weigh different scores vs each other (equal weight = 1 for everything)
-            "modality": 3,
-            "days": 1,
-            "gaps": 1
-        },
-        "preferences": modality_preferences, # 0 if section modality matches preferred modality; 1 penalty point if it does not
-        "day_weights": {1: 0, 2: 1, 3: 2, 4: 3, 5: 4},  # 1 day a week = no penalty; 2 days a week = 1 penalty point; etc.
-        "gap_weights": {
-            "mandatory_break_start": "12:15 PM",  # "mandatory break" is College Hour
-            "mandatory_break_end": "1:15 PM",
-            "max_allowed_gap": 20  # In minutes
-        }
-    }
-
-    # Calculate combined scores
-    valid_combinations_with_scores = [(combination, *combined_score(combination, config)) for combination in valid_combinations]
-
-    # Print summary
-    print_summary(valid_combinations_with_scores)
+        # Print summary
+        with stage(stats, "output"):
+            print_summary(valid_combinations_with_scores)
 
     # Close the connection
     conn.close()
 
+    if stats is not None:
+        stats.report(report_path)
+
 if __name__ == "__main__":
     main()
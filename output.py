@@ -0,0 +1,81 @@
+import csv
+import json
+import sys
+
+from session import parse_minutes
+
+# Section fields included in the JSON lines and CSV output
+OUTPUT_FIELDS = ["Name", "Method", "Mtg_Days", "STime", "ETime", "SDate", "EDate", "Avail_Seats"]
+SCORE_FIELDS = ["combined_score", "modality_score", "days_score", "gap_score"]
+
+DAY_TO_NUMBER = {'M': 0, 'T': 1, 'W': 2, 'TH': 3, 'F': 4, 'S': 5}
+
+def section_sort_key(section):
+    """
+    Display order of a section within a schedule: by first meeting day, then start time; online sections last.
+    """
+    if section["Method"] == "ONLIN":
+        return (7, 0)  # Online sections get assigned to 8th day of the week, so that they are printed last
+    first_day = section["Mtg_Days"].split(', ')[0] if section["Mtg_Days"] != 'nan' else 'nan'
+    day_number = DAY_TO_NUMBER.get(first_day, 6)  # Use 6 for 'nan' to sort them after regular days
+    start_time = parse_minutes(section["STime"])
+    return (day_number, start_time if start_time is not None else 0)
+
+def iter_options(results, offset=0, limit=None):
+    """
+    Lazily yield (option_number, sections, scores) for one page of ranked results (a session.ScheduleResults).
+    Sections are in display order; only the schedules of the requested page are rendered.
+    """
+    end = len(results) if limit is None else min(len(results), offset + limit)
+    sort_keys = {}
+    for position in range(offset, end):
+        indices, *scores = results[position]
+        for index in indices:
+            if index not in sort_keys:
+                sort_keys[index] = section_sort_key(results.sections[index])
+        ordered = sorted(indices, key=sort_keys.__getitem__)
+        yield position + 1, [results.sections[index] for index in ordered], scores
+
+def format_section(section):
+    meeting_days = section["Mtg_Days"] if section["Mtg_Days"] != 'nan' else "Online"
+    meeting_times = f"{section['STime']} - {section['ETime']}" if section['STime'] != 'nan' and section['ETime'] != 'nan' else ""
+    return f"  {section['Name']} ({meeting_days} {meeting_times})"
+
+def write_text(results, out=None, offset=0, limit=None):
+    """
+    Stream one page of results as the human-readable option listing.
+    """
+    out = out or sys.stdout
+    for option, sections, (combined_score, modality_score, days_score, gap_score) in iter_options(results, offset, limit):
+        lines = [f"Option {option} (combined score = {combined_score}, modality score = {modality_score}, days score = {days_score}, gap score = {gap_score}):"]
+        lines.extend(format_section(section) for section in sections)
+        out.write("\n".join(lines) + "\n\n")
+
+def iter_records(results, offset=0, limit=None):
+    """
+    Lazily yield one page of results as JSON-ready dicts (option number, scores and section fields).
+    """
+    for option, sections, scores in iter_options(results, offset, limit):
+        record = {"option": option, **dict(zip(SCORE_FIELDS, scores))}
+        record["sections"] = [{field: section.get(field) for field in OUTPUT_FIELDS} for section in sections]
+        yield record
+
+def write_jsonl(results, out=None, offset=0, limit=None):
+    """
+    Stream one page of results as JSON lines, one schedule per line.
+    """
+    out = out or sys.stdout
+    for record in iter_records(results, offset, limit):
+        out.write(json.dumps(record) + "\n")
+
+def write_csv(results, out=None, offset=0, limit=None):
+    """
+    Stream one page of results as CSV, one row per section of each schedule.
+    """
+    out = out or sys.stdout
+    writer = csv.writer(out)
+    writer.writerow(["option"] + SCORE_FIELDS + OUTPUT_FIELDS)
+    for option, sections, scores in iter_options(results, offset, limit):
+        writer.writerows([option, *scores] + [section.get(field) for field in OUTPUT_FIELDS] for section in sections)
+
+WRITERS = {"text": write_text, "jsonl": write_jsonl, "csv": write_csv}
@@ -0,0 +1,92 @@
+import cProfile
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+class StageProfiler:
+    """
+    Opt-in cProfile + tracemalloc capture for each stage of the scheduling pipeline.
+
+    Attach it to an instrumentation.PipelineStats (PipelineStats(profiler=...)) and wrap each request in
+    profiler.request(). For every sampled request it writes, per stage, into output_dir/<request label>/:
+      <stage>.prof        cProfile stats (pstats, snakeviz, gprof2dot, ...)
+      <stage>.snapshot    tracemalloc snapshot taken at the end of the stage (tracemalloc.Snapshot.load)
+      <stage>.alloc.txt   top allocation sites of the stage (memory allocated during the stage, by line)
+    Only every Nth request is sampled (sample_every), and only one request at a time, so a service can keep
+    the profiler switched on.
+    """
+    def __init__(self, output_dir='profiles', sample_every=1, top_allocations=10):
+        self.output_dir = output_dir
+        self.sample_every = max(1, sample_every)
+        self.top_allocations = top_allocations
+        self._requests = 0
+        self._lock = threading.Lock()
+        self._owner = None  # thread of the request being profiled
+        self._request_dir = None
+        self._started_tracemalloc = False
+
+    @property
+    def active(self):
+        return self._owner == threading.get_ident()
+
+    @contextmanager
+    def request(self, label=None):
+        """
+        Mark one pipeline request. Yields True if this request is profiled.
+        """
+        with self._lock:
+            self._requests += 1
+            sampled = self._owner is None and (self._requests - 1) % self.sample_every == 0
+            if sampled:
+                self._owner = threading.get_ident()
+        if not sampled:
+            yield False
+            return
+
+        label = label or f"{time.strftime('%Y%m%d-%H%M%S')}-{self._requests}"
+        self._request_dir = os.path.join(self.output_dir, label)
+        os.makedirs(self._request_dir, exist_ok=True)
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+        try:
+            yield True
+        finally:
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            self._request_dir = None
+            with self._lock:
+                self._owner = None
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Profile one stage of the current request (no-op unless the request is sampled on this thread).
+        """
+        if not self.active:
+            yield
+            return
+
+        snapshot_before = tracemalloc.take_snapshot()
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            snapshot_after = tracemalloc.take_snapshot()
+            self._write_stage(name, profile, snapshot_before, snapshot_after)
+
+    def _write_stage(self, name, profile, snapshot_before, snapshot_after):
+        path = os.path.join(self._request_dir, name)
+        profile.dump_stats(path + '.prof')
+        snapshot_after.dump(path + '.snapshot')
+
+        ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+        differences = snapshot_after.filter_traces(ignore).compare_to(snapshot_before.filter_traces(ignore), 'lineno')
+        with open(path + '.alloc.txt', 'w') as alloc_file:
+            alloc_file.write(f"Top {self.top_allocations} allocation sites during stage '{name}':\n")
+            for difference in differences[:self.top_allocations]:
+                alloc_file.write(f"{difference}\n")
@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from datetime import datetime
+import threading
+
+from catalog import get_catalog_version
+from main import default_config, generate_schedules
+from session import flatten_courses, slot_courses
+
+def normalize_unavailability(unavailability_blocks):
+    """
+    Turn the unavailability blocks into a hashable mask: day -> sorted (start, end) minute intervals.
+    """
+    def to_minutes(time_str):
+        parsed = datetime.strptime(time_str, '%I:%M %p')
+        return parsed.hour * 60 + parsed.minute
+
+    return tuple(sorted(
+        (day, tuple(sorted((to_minutes(start), to_minutes(end)) for start, end in blocks)))
+        for day, blocks in unavailability_blocks.items()
+    ))
+
+def make_cache_key(selected_courses, modality_preferences, unavailability_blocks, config, top_k, catalog_version):
+    """
+    Build the normalized cache key for one schedule request.
+    The order of the availability input does not matter. Course order does: it is the order of the sections in
+    every schedule and of the search, which decides between equally scored schedules at the top_k cut.
+    """
+    gap_weights = config["gap_weights"]
+    return (
+        tuple(slot_courses(slot) for slot in selected_courses),
+        tuple(sorted((course, modality_preferences.get(course)) for course in flatten_courses(selected_courses))),
+        normalize_unavailability(unavailability_blocks),
+        tuple(sorted(config["weights"].items())),
+        tuple(sorted(config["day_weights"].items())),
+        (gap_weights["mandatory_break_start"], gap_weights["mandatory_break_end"], gap_weights["max_allowed_gap"]),
+        top_k,
+        catalog_version,
+    )
+
+def seat_snapshot(cursor, selected_courses):
+    """
+    Return (Name, Avail_Seats, Status) for every section of the selected courses and for their corequisite sections.
+    Any seat or status change in this snapshot invalidates a cached result.
+    """
+    selected_courses = flatten_courses(selected_courses)
+    if not selected_courses:
+        return ()
+
+    placeholders = ', '.join('?' for _ in selected_courses)
+    cursor.execute(f"""
+        SELECT Name, Avail_Seats, Status, Corequisite
+        FROM schedule
+        WHERE Course_Name IN ({placeholders})
+    """, tuple(selected_courses))
+    rows = cursor.fetchall()
+
+    section_names = {row[0] for row in rows}
+    coreq_names = {coreq.strip() for row in rows if row[3] for coreq in row[3].split(',')} - section_names
+    if coreq_names:
+        placeholders = ', '.join('?' for _ in coreq_names)
+        cursor.execute(f"""
+            SELECT Name, Avail_Seats, Status, Corequisite
+            FROM schedule
+            WHERE Name IN ({placeholders})
+        """, tuple(coreq_names))
+        rows += cursor.fetchall()
+
+    return tuple(sorted((name, avail_seats, status) for name, avail_seats, status, _ in rows))
+
+class ScheduleCache:
+    """
+    Bounded LRU cache of scored schedule results.
+    Each entry remembers the seat snapshot it was computed from and is dropped as soon as the snapshot changes.
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, snapshot):
+        """
+        Return the cached results for key, or None if missing or computed from a different seat snapshot.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            cached_snapshot, results = entry
+            if cached_snapshot != snapshot:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return results
+
+    def put(self, key, snapshot, results):
+        """
+        Store results for key, evicting the least recently used entries beyond maxsize.
+        """
+        with self._lock:
+            self._entries[key] = (snapshot, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def cached_generate_schedules(cache, cursor, selected_courses, modality_preferences, unavailability_blocks, config=None, top_k=None, stats=None):
+    """
+    Same as main.generate_schedules, but served from cache when an identical request was already answered
+    against the same catalog version and the same seat counts. stats only records the runs that miss the cache.
+    """
+    if config is None:
+        config = default_config(modality_preferences)
+
+    key = make_cache_key(selected_courses, modality_preferences, unavailability_blocks, config, top_k, get_catalog_version(cursor))
+    snapshot = seat_snapshot(cursor, selected_courses)
+    results = cache.get(key, snapshot)
+    if results is None:
+        results = generate_schedules(cursor, selected_courses, modality_preferences, unavailability_blocks, config, top_k, stats)
+        cache.put(key, snapshot, results)
+    return results
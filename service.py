@@ -0,0 +1,222 @@
+# JSON scheduling service on the standard library HTTP server (python cli.py serve).
+# Every connection gets its own handler thread, which reads through its own CatalogPool connection; identical
+# requests are answered from a ScheduleCache while the catalog version and the seat counts are unchanged.
+# With a profiling.StageProfiler, every Nth search is profiled per stage (python cli.py serve --profile DIR).
+#   POST /schedules  {"courses": ["ENG-103", ["MAT-143", "MAT-152"]], "modality_preferences": {"ENG-103": "LEC"},
+#                     "unavailability_blocks": {"Mon": [["12:00 AM", "10:00 AM"]]}, "top_k": 20}
+#   POST /cohort     {"students": [{"id": 1, "courses": [...]}, ...], "options_per_student": 20}
+#   GET  /health
+import json
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from allocation import plan_cohort
+from catalog import DB_NAME, CatalogPool, get_catalog_version
+from instrumentation import PipelineStats
+from main import generate_schedules
+from output import iter_records
+from schedule_cache import ScheduleCache, cached_generate_schedules
+
+DEFAULT_TOP_K = 50
+MAX_BODY_BYTES = 1024 * 1024
+
+def parse_courses(courses):
+    """
+    selected_courses from JSON: a list entry is a slot of alternative courses, any one of which will do.
+    """
+    if not isinstance(courses, list) or not courses:
+        raise ValueError('"courses" must be a non-empty list')
+    selected_courses = []
+    for course in courses:
+        if isinstance(course, list) and course and all(isinstance(name, str) for name in course):
+            selected_courses.append(tuple(course))
+        elif isinstance(course, str):
+            selected_courses.append(course)
+        else:
+            raise ValueError(f"invalid course entry: {course!r}")
+    return selected_courses
+
+def parse_preferences(payload):
+    """
+    (modality_preferences, unavailability_blocks) of a JSON request or student. Raises ValueError if malformed.
+    """
+    modality_preferences = payload.get("modality_preferences")
+    if modality_preferences is None:
+        modality_preferences = {}
+    if not isinstance(modality_preferences, dict) or not all(isinstance(method, str) for method in modality_preferences.values()):
+        raise ValueError('"modality_preferences" must be an object of course: method')
+    blocks_by_day = payload.get("unavailability_blocks")
+    if blocks_by_day is None:
+        blocks_by_day = {}
+    if not isinstance(blocks_by_day, dict):
+        raise ValueError('"unavailability_blocks" must be an object of day: [[start, end], ...]')
+    unavailability_blocks = {}
+    for day, blocks in blocks_by_day.items():
+        if not isinstance(blocks, list) or not all(
+                isinstance(block, list) and len(block) == 2 and all(isinstance(time_str, str) for time_str in block)
+                for block in blocks):
+            raise ValueError(f'"unavailability_blocks" of {day} must be a list of [start, end] times')
+        unavailability_blocks[day] = [tuple(block) for block in blocks]
+    return modality_preferences, unavailability_blocks
+
+def parse_request(payload):
+    """
+    Arguments of main.generate_schedules from a JSON request:
+    (selected_courses, modality_preferences, unavailability_blocks, top_k). Raises ValueError if malformed.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("the request must be a JSON object")
+    selected_courses = parse_courses(payload.get("courses"))
+    modality_preferences, unavailability_blocks = parse_preferences(payload)
+    top_k = payload.get("top_k", DEFAULT_TOP_K)
+    if top_k is not None and (not isinstance(top_k, int) or top_k < 1):
+        raise ValueError('"top_k" must be a positive integer or null')
+    return selected_courses, modality_preferences, unavailability_blocks, top_k
+
+def parse_cohort(payload):
+    """
+    (students, options_per_student) of a JSON cohort request, students as for allocation.plan_cohort.
+    Raises ValueError if malformed.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("the request must be a JSON object")
+    students = payload.get("students")
+    if not isinstance(students, list) or not students:
+        raise ValueError('"students" must be a non-empty list')
+    parsed = []
+    for student in students:
+        if not isinstance(student, dict):
+            raise ValueError(f"invalid student entry: {student!r}")
+        modality_preferences, unavailability_blocks = parse_preferences(student)
+        parsed.append({
+            "id": student.get("id"),
+            "courses": parse_courses(student.get("courses")),
+            "modality_preferences": modality_preferences,
+            "unavailability_blocks": unavailability_blocks,
+        })
+    options_per_student = payload.get("options_per_student", 20)
+    if not isinstance(options_per_student, int) or options_per_student < 1:
+        raise ValueError('"options_per_student" must be a positive integer')
+    return parsed, options_per_student
+
+class ScheduleServer(ThreadingHTTPServer):
+    """
+    The scheduling service. serve_forever() answers requests until shutdown(); server_close() closes the pool.
+    Pass port 0 to bind a free port (see server_address).
+    """
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=8000, db_name=DB_NAME, cache_size=256, verbose=False, profiler=None):
+        super().__init__((host, port), ScheduleRequestHandler)
+        self.pool = CatalogPool(db_name)
+        self.cache = ScheduleCache(cache_size) if cache_size else None
+        self.verbose = verbose
+        self.profiler = profiler  # a profiling.StageProfiler; it samples every Nth request itself
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.pool.release()  # the thread ends with its connection
+
+    def server_close(self):
+        super().server_close()
+        self.pool.close()
+
+    def schedules(self, payload):
+        selected_courses, modality_preferences, unavailability_blocks, top_k = parse_request(payload)
+        start = time.perf_counter()
+        cursor = self.pool.cursor()
+        profiler = self.profiler
+        stats = PipelineStats(profiler=profiler) if profiler is not None else None
+        with (profiler.request() if profiler is not None else nullcontext()):
+            if self.cache is not None:
+                results = cached_generate_schedules(self.cache, cursor, selected_courses, modality_preferences,
+                                                    unavailability_blocks, top_k=top_k, stats=stats)
+            else:
+                results = generate_schedules(cursor, selected_courses, modality_preferences, unavailability_blocks,
+                                             top_k=top_k, stats=stats)
+        return {
+            "count": len(results),
+            "seconds": time.perf_counter() - start,
+            "schedules": list(iter_records(results)),
+        }
+
+    def cohort(self, payload):
+        students, options_per_student = parse_cohort(payload)
+        placements, summary = plan_cohort(self.pool.cursor(), students, options_per_student)
+        return {"placements": placements, "summary": summary}
+
+    def health(self):
+        cache = self.cache
+        return {
+            "status": "ok",
+            "catalog_version": get_catalog_version(self.pool.cursor()),
+            "cache": {"entries": len(cache), "hits": cache.hits, "misses": cache.misses} if cache is not None else None,
+        }
+
+class ScheduleRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so load generators and front ends can reuse connections
+
+    def do_GET(self):
+        if self.path != "/health":
+            self.send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        self.send_json(200, self.server.health())
+
+    def do_POST(self):
+        routes = {"/schedules": self.server.schedules, "/cohort": self.server.cohort}
+        route = routes.get(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True  # the body is not read
+            self.send_json(413, {"error": "request body too large"})
+            return
+        body = self.rfile.read(length)
+        if route is None:
+            self.send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        try:
+            response = route(json.loads(body))
+        except ValueError as e:  # malformed JSON, bad arguments or times
+            self.send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self.log_error("%s failed: %r", self.path, e)
+            self.send_json(500, {"error": "internal error"})
+            return
+        self.send_json(200, response)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def log_error(self, format, *args):
+        super().log_message(format, *args)  # errors are logged even when not verbose
+
+def serve(host="127.0.0.1", port=8000, db_name=DB_NAME, cache_size=256, verbose=False, profile_dir=None,
+          profile_every=100):
+    """
+    Run the service until interrupted. With profile_dir, every profile_every-th request is profiled into it.
+    """
+    profiler = None
+    if profile_dir:
+        from profiling import StageProfiler
+        profiler = StageProfiler(profile_dir, sample_every=profile_every)
+    server = ScheduleServer(host, port, db_name, cache_size, verbose, profiler)
+    print(f"Serving schedules on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,702 @@
+# Per-course-set search state that can be re-queried with different availability, preferences and weights.
+# The expensive products (sections with their coreq bundles, the pairwise conflict table and the
+# equivalence classes of interchangeable sections) are built once in ScheduleSession.__init__;
+# ScheduleSession.run only redoes the availability filter, the search and the scoring.
+import heapq
+from array import array
+from collections.abc import Sequence
+from datetime import datetime
+from itertools import product
+
+from instrumentation import stage
+
+DAY_MAP = {'M': 'Mon', 'T': 'Tue', 'W': 'Wed', 'TH': 'Thu', 'F': 'Fri', 'S': 'Sat'}
+GAP_DAYS = list(DAY_MAP.keys())  # days scored for gaps, in this order
+BREAK_DAYS = {'M', 'W', 'F'}  # days with the mandatory break (College Hour)
+
+def parse_minutes(time_str):
+    """
+    Convert a time such as '9:05 AM' into minutes after midnight ('nan' -> None).
+    """
+    if time_str == 'nan':
+        return None
+    parsed = datetime.strptime(time_str, '%I:%M %p')
+    return parsed.hour * 60 + parsed.minute
+
+def parse_date(date_str):
+    """
+    Convert an SDate/EDate value from the database into a datetime.
+    """
+    return datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S')
+
+def slot_courses(slot):
+    """
+    Courses that can fill one slot of a request: a single course name, or a tuple of alternatives ("any of").
+    """
+    return tuple(slot) if isinstance(slot, (tuple, list)) else (slot,)
+
+def flatten_courses(selected_courses):
+    """
+    Every course named in a request, alternatives included, without duplicates.
+    """
+    return list(dict.fromkeys(course for slot in selected_courses for course in slot_courses(slot)))
+
+def split_meetings(mtg_days, stime_extra, etime_extra):
+    """
+    Split a section's meeting data into (day, start, end) meetings, times still as strings.
+
+    Mtg_Days lists one day group per meeting ('M, F'); STime_Extra/ETime_Extra hold the matching times
+    ('10:10 AM,  8:00 AM'). When the counts differ, every day gets the first time, as in STime/ETime.
+    Within a day group the export separates days with 'ü' ('MüW' = Monday and Wednesday).
+    """
+    if mtg_days == 'nan':
+        return []
+    day_groups = [group.strip() for group in mtg_days.split(',')]
+    starts = [time_str.strip() for time_str in stime_extra.split(',')]
+    ends = [time_str.strip() for time_str in etime_extra.split(',')]
+    if not (len(day_groups) == len(starts) == len(ends)):
+        starts = [starts[0]] * len(day_groups)
+        ends = [ends[0]] * len(day_groups)
+
+    meetings = []
+    for group, start, end in zip(day_groups, starts, ends):
+        for day in group.split('\u00fc'):
+            meeting = (day.strip(), start, end)
+            if meeting[0] and meeting not in meetings:
+                meetings.append(meeting)
+    return meetings
+
+def patterns_conflict(pattern, other):
+    """
+    Whether two parsed (meetings, start_date, end_date) patterns conflict: their date ranges overlap and some
+    meeting of one overlaps in time a meeting of the other on the same day token (exact match, so 'T' is not
+    'TH'). Meetings without times (online) never conflict.
+    """
+    meetings, start_date, end_date = pattern
+    other_meetings, other_start_date, other_end_date = other
+    if not (start_date <= other_end_date and end_date >= other_start_date):
+        return False
+    for day, start, end in meetings:
+        if start is None or end is None:
+            continue
+        for other_day, other_start, other_end in other_meetings:
+            if other_start is None or other_end is None or day != other_day:
+                continue
+            if start < other_end and end > other_start:
+                return True
+    return False
+
+MINUTES_PER_DAY = 1440
+
+def occupancy_mask(meetings, day_slots):
+    """
+    Weekly day/time mask of a meeting pattern: one bit per minute of [start, end) of each meeting.
+    day_slots maps day tokens to their position in the mask and is extended as new tokens show up.
+    """
+    mask = 0
+    for day, start, end in meetings:
+        if start is None or end is None or end <= start:
+            continue
+        slot = day_slots.setdefault(day, len(day_slots))
+        mask |= ((1 << (end - start)) - 1) << (slot * MINUTES_PER_DAY + start)
+    return mask
+
+NO_SECTION = 0xFFFF  # padding in ScheduleResults rows (coreq slot not used)
+PROGRESS_EVERY = 256  # search nodes between two calls of the progress callback
+
+class SearchCancelled(Exception):
+    """
+    Raised by a progress callback to stop ScheduleSession.run (see async_search.py).
+    """
+
+class ScheduleResults(Sequence):
+    """
+    Ranked schedules stored compactly: each schedule is one fixed-width row of unsigned shorts in a single
+    array('H') (indices into the shared section table `sections`) plus the id of its score tuple, which is
+    shared by all schedules expanded from the same equivalence classes.
+    Items are (indices, combined_score, modality_score, days_score, gap_score); section dicts are only built
+    by combination(i), at render time.
+    """
+    def __init__(self, sections, width):
+        self.sections = sections
+        self.width = width
+        self._indices = array('H')
+        self._score_ids = array('I')
+        self._scores = []
+
+    def add_scores(self, scores):
+        self._scores.append(tuple(scores))
+        return len(self._scores) - 1
+
+    def append(self, indices, score_id):
+        row = list(indices)
+        row += [NO_SECTION] * (self.width - len(row))
+        self._indices.extend(row)
+        self._score_ids.append(score_id)
+
+    def __len__(self):
+        return len(self._score_ids)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        return (self.indices(position), *self._scores[self._score_ids[position]])
+
+    def indices(self, position):
+        row = self._indices[position * self.width:(position + 1) * self.width]
+        return row[:row.index(NO_SECTION)] if NO_SECTION in row else row
+
+    def combination(self, position):
+        """
+        The section dicts of one schedule: base sections in course order, then their corequisites.
+        """
+        return [self.sections[index] for index in self.indices(position)]
+
+class SectionClass:
+    """
+    Options of one course (a section plus at most one chosen corequisite) that are interchangeable:
+    same course names, modality, meeting days, times and dates, so they conflict and score identically.
+    """
+    __slots__ = ('slot', 'course_mask', 'members', 'patterns', 'pattern_mask', 'conflict_mask', 'internal_conflict')
+
+    def __init__(self, slot, course_mask, patterns):
+        self.slot = slot
+        self.course_mask = course_mask  # bit of the course this class schedules, so no course is taken twice
+        self.members = []
+        self.patterns = patterns
+        self.pattern_mask = 0
+        self.conflict_mask = 0
+        self.internal_conflict = False
+
+class ScheduleSession:
+    """
+    Search state for one set of courses.
+    Build it from the output of main.process_corequisites (see main.open_session) and call run() for every
+    availability / preference / weighting the student wants to try.
+
+    Each entry of selected_courses is one slot of the schedule: a course name, or a tuple of alternative
+    courses of which any one will do. Alternatives are searched together, sharing pruning and the top_k bound.
+    section_patterns optionally maps section names to already parsed (meetings, start_date, end_date),
+    as shared_catalog.SharedCatalog provides them.
+    """
+    def __init__(self, selected_courses, sections_info, section_patterns=None):
+        self.selected_courses = list(selected_courses)
+        self._section_patterns = section_patterns or {}
+        self.sections = []  # shared section table, referenced by index
+        self._section_index = {}
+        self._patterns = []
+        self._pattern_index = {}
+
+        # Per-section data needed by the search and the scoring, parsed once
+        self._course = []
+        self._method = []
+        self._pattern = []
+        self._day_meetings = []
+        self._campus_days = []
+        self._day_tokens = {}
+
+        self.classes = []  # per course slot, list of SectionClass
+        course_bits = {course: 1 << bit for bit, course in enumerate(flatten_courses(self.selected_courses))}
+        for slot, slot_entry in enumerate(self.selected_courses):
+            classes_by_key = {}
+            for course in slot_courses(slot_entry):
+                for section, coreqs in sections_info.get(course, []):
+                    base = self._add_section(section)
+                    options = [(base, self._add_section(coreq)) for coreq in coreqs] if coreqs else [(base,)]
+                    for option in options:
+                        key = tuple(self._class_key(index) for index in option)
+                        section_class = classes_by_key.get(key)
+                        if section_class is None:
+                            section_class = SectionClass(slot, course_bits[course], tuple(self._pattern[index] for index in option))
+                            classes_by_key[key] = section_class
+                        section_class.members.append(option)
+            self.classes.append(list(classes_by_key.values()))
+
+        self._build_conflicts()
+        self.precomputed = None  # feasible class combinations loaded by attach_precomputed
+
+    def _add_section(self, section):
+        index = self._section_index.get(section["Name"])
+        if index is not None:
+            return index
+        index = len(self.sections)
+        self._section_index[section["Name"]] = index
+        self.sections.append(section)
+
+        # Every meeting of the section, parsed once: sections meeting at different times on different days
+        # (STime_Extra/ETime_Extra) are checked and scored per meeting
+        parsed = self._section_patterns.get(section["Name"])
+        if parsed is None:
+            meetings = tuple(
+                (day, parse_minutes(start), parse_minutes(end))
+                for day, start, end in split_meetings(
+                    section["Mtg_Days"], section.get("STime_Extra") or section["STime"], section.get("ETime_Extra") or section["ETime"]
+                )
+            )
+            parsed = (meetings, parse_date(section["SDate"]), parse_date(section["EDate"]))
+        meetings, start_date, end_date = parsed
+        pattern = (frozenset(meetings), start_date, end_date)
+        pattern_id = self._pattern_index.get(pattern)
+        if pattern_id is None:
+            pattern_id = len(self._patterns)
+            self._pattern_index[pattern] = pattern_id
+            self._patterns.append(pattern)
+
+        self._course.append('-'.join(section["Name"].split('-')[:2]))
+        self._method.append(section["Method"])
+        self._pattern.append(pattern_id)
+        # Per day of GAP_DAYS: (sort key, start, end) of the section's meetings on that day. The key orders by start,
+        # then end, so meetings starting together score the same whatever the order of the requested courses
+        self._day_meetings.append(tuple(
+            tuple(((start if start is not None else 0, end if end is not None else 0), start, end)
+                  for meeting_day, start, end in meetings if meeting_day == day)
+            for day in GAP_DAYS
+        ))
+        campus_days = 0
+        if section["Method"] != "ONLIN":
+            for day, start, end in meetings:
+                campus_days |= 1 << self._day_tokens.setdefault(day, len(self._day_tokens))
+        self._campus_days.append(campus_days)
+        return index
+
+    def _class_key(self, index):
+        section = self.sections[index]
+        return (self._course[index], section["Method"], self._pattern[index])
+
+    def _build_conflicts(self):
+        """
+        Pairwise conflict table between distinct meeting patterns, as one bitmask per pattern.
+
+        Patterns are grouped by date segment (SDate, EDate). Groups whose segments never overlap are skipped
+        as a whole; within overlapping segments two patterns conflict when their weekly day/time masks intersect.
+        """
+        self._segments = {}
+        for pattern_id, (meetings, start_date, end_date) in enumerate(self._patterns):
+            self._segments.setdefault((start_date, end_date), []).append(pattern_id)
+
+        day_slots = {}
+        masks = [occupancy_mask(meetings, day_slots) for meetings, _, _ in self._patterns]
+        # Malformed times (end before start) are left to the plain pairwise rule
+        irregular = {
+            pattern_id for pattern_id, (meetings, _, _) in enumerate(self._patterns)
+            if any(start is not None and end is not None and end <= start for _, start, end in meetings)
+        }
+
+        self._pattern_conflicts = [0] * len(self._patterns)
+        segments = list(self._segments.items())
+        for a, ((start_date, end_date), group) in enumerate(segments):
+            for (other_start_date, other_end_date), other_group in segments[a:]:
+                if not (start_date <= other_end_date and end_date >= other_start_date):
+                    continue
+                for i in group:
+                    if not masks[i] and i not in irregular:
+                        continue
+                    for j in other_group:
+                        if i in irregular or j in irregular:
+                            conflict = patterns_conflict(self._patterns[i], self._patterns[j])
+                        else:
+                            conflict = masks[i] & masks[j]
+                        if conflict:
+                            self._pattern_conflicts[i] |= 1 << j
+                            self._pattern_conflicts[j] |= 1 << i
+
+        for slot_classes in self.classes:
+            for section_class in slot_classes:
+                for k, pattern_id in enumerate(section_class.patterns):
+                    section_class.pattern_mask |= 1 << pattern_id
+                    section_class.conflict_mask |= self._pattern_conflicts[pattern_id]
+                    # A section clashing with its own corequisite can never be scheduled
+                    for other_id in section_class.patterns[:k]:
+                        if self._pattern_conflicts[pattern_id] >> other_id & 1:
+                            section_class.internal_conflict = True
+
+    def feasible_combinations(self):
+        """
+        Every combination of classes (one per slot, as positions in self.classes[slot]) without a time conflict,
+        regardless of availability. This is what bundles.py precomputes for popular course bundles.
+        """
+        combinations = []
+        chosen = [None] * len(self.classes)
+
+        def search(slot, occupied, used_courses):
+            if slot == len(self.classes):
+                combinations.append(tuple(chosen))
+                return
+            for position, section_class in enumerate(self.classes[slot]):
+                if (section_class.internal_conflict or section_class.conflict_mask & occupied or
+                        section_class.course_mask & used_courses):
+                    continue
+                chosen[slot] = position
+                search(slot + 1, occupied | section_class.pattern_mask, used_courses | section_class.course_mask)
+
+        search(0, 0, 0)
+        return combinations
+
+    def combination_profile(self, classes_by_slot, break_start, break_end, max_allowed_gap):
+        """
+        (number of campus days, gap score) of a class combination: the parts of its score that depend neither on
+        the student's availability nor on their modality preferences.
+        """
+        campus_days = 0
+        for index in self._ordered_members(classes_by_slot):
+            campus_days |= self._campus_days[index]
+        gap_score = self._gap_score(self._ordered_members(classes_by_slot), break_start, break_end, max_allowed_gap)
+        return bin(campus_days).count('1'), gap_score
+
+    def attach_precomputed(self, stored, slot_order=None):
+        """
+        Use the combinations precomputed by feasible_combinations on an earlier session over the same courses.
+        stored is a dict with
+          classes       per stored slot, the member options of each class as tuples of section names
+          combinations  the class positions of every combination, flattened (array('H'), one row per combination)
+          class_masks   per stored slot and class, the combinations using the class as a bitmask (bit i = row i)
+          buckets       (campus days, gap score, bitmask of the combinations with that profile)
+          gap_config    (break start, break end, max allowed gap) the gap scores were computed with
+        slot_order gives the stored slot of each of this session's slots, if the courses were stored in another order.
+        Sections that filled up since are simply missing from the live classes; if a live class does not
+        match a stored one (new or reopened sections), the session keeps searching and this returns False.
+        """
+        stored_classes = stored["classes"]
+        slot_order = list(range(len(self.classes))) if slot_order is None else slot_order
+        if sorted(slot_order) != list(range(len(stored_classes))):
+            return False
+        live_by_stored = []  # per slot, the live class of each stored class position (None if gone)
+        for slot_classes, stored_slot in zip(self.classes, slot_order):
+            stored_by_option = {option: position for position, members in enumerate(stored_classes[stored_slot]) for option in members}
+            live = [None] * len(stored_classes[stored_slot])
+            for section_class in slot_classes:
+                positions = {stored_by_option.get(tuple(self.sections[index]["Name"] for index in option))
+                             for option in section_class.members}
+                if len(positions) != 1 or None in positions:
+                    return False
+                live[positions.pop()] = section_class
+            live_by_stored.append(live)
+
+        self.precomputed = {
+            "combinations": stored["combinations"],
+            "width": len(stored_classes),
+            "slot_order": slot_order,
+            "live_by_stored": live_by_stored,
+            "class_masks": [stored["class_masks"][stored_slot] for stored_slot in slot_order],
+            "buckets": stored["buckets"],
+            "gap_config": tuple(stored["gap_config"]),
+        }
+        return True
+
+    def _extrinsic_conflicts(self, unavailability_blocks):
+        """
+        Per distinct meeting pattern: whether any of its timed meetings overlaps an unavailability block of
+        its day. Evaluated once per pattern rather than once per section.
+        """
+        blocks_by_day = {
+            day: [(parse_minutes(block[0]), parse_minutes(block[1])) for block in blocks]
+            for day, blocks in unavailability_blocks.items()
+        }
+        conflicts = []
+        for meetings, start_date, end_date in self._patterns:
+            conflict = False
+            for day, start, end in meetings:
+                if start is None or end is None:
+                    continue
+                for block_start, block_end in blocks_by_day.get(DAY_MAP.get(day), ()):
+                    if start < block_end and end > block_start:
+                        conflict = True
+            conflicts.append(conflict)
+        return conflicts
+
+    def _ordered_members(self, classes_by_slot):
+        """
+        Representative sections of one schedule in the order the scoring sees them: base sections, then coreqs.
+        """
+        options = [section_class.members[0] for section_class in classes_by_slot]
+        return [option[0] for option in options] + [option[1] for option in options if len(option) > 1]
+
+    def _gap_score(self, members, break_start, break_end, max_allowed_gap):
+        """
+        Gap score of one schedule: on each day, meetings are ordered by start then end time, and every gap
+        between consecutive meetings longer than max_allowed_gap minutes adds round(gap hours) ** 2, except a gap
+        spanning the mandatory break on BREAK_DAYS. Meetings come from the pre-parsed meetings of each day
+        (STime_Extra/ETime_Extra per day). The score does not depend on the order of members.
+        """
+        gap_score = 0
+        for bit, day in enumerate(GAP_DAYS):
+            day_meetings = [meeting for index in members for meeting in self._day_meetings[index][bit]]
+            if len(day_meetings) < 2:
+                continue
+            day_meetings.sort(key=lambda meeting: meeting[0])
+            for (_, prev_start, prev_end), (_, curr_start, curr_end) in zip(day_meetings, day_meetings[1:]):
+                if prev_end is None or curr_start is None:
+                    continue
+                if day in BREAK_DAYS and prev_end <= break_start and curr_start >= break_end:
+                    continue  # Skip mandatory break gaps
+                gap_minutes = (curr_start - prev_end) % 1440
+                if gap_minutes > max_allowed_gap:
+                    gap_hours = round(gap_minutes / 60)
+                    gap_score += (gap_hours ** 2)
+        return gap_score
+
+    def run(self, unavailability_blocks, config, top_k=None, stats=None, progress=None):
+        """
+        Find, score and rank every valid schedule for this course set.
+        Returns a ScheduleResults of (indices, combined_score, modality_score, days_score, gap_score), best
+        first, truncated to top_k if given. Timings and search counters go to stats (an instrumentation.PipelineStats).
+
+        progress, if given, is called every PROGRESS_EVERY search nodes (and once the search is done) with a dict:
+        explored / pruned_intrinsic / pruned_bound / valid counters, best_score (None until a schedule is found),
+        improved (the best schedules changed since the last call) and snapshot, a function returning the best
+        schedules found so far as a ScheduleResults. While the results are expanded it is called with None.
+        Raising SearchCancelled from the callback stops the run.
+        """
+        if top_k is not None and top_k <= 0:
+            return ScheduleResults(self.sections, 2 * len(self.selected_courses))
+
+        preferences = config["preferences"]
+        weights = config["weights"]
+        day_weights = config["day_weights"]
+        break_start = parse_minutes(config["gap_weights"]["mandatory_break_start"])
+        break_end = parse_minutes(config["gap_weights"]["mandatory_break_end"])
+        max_allowed_gap = config["gap_weights"]["max_allowed_gap"]
+
+        # Cheap per-request filtering: drop classes that hit the unavailability blocks
+        with stage(stats, "validation"):
+            extrinsic = self._extrinsic_conflicts(unavailability_blocks)
+            candidates = []
+            pruned_intrinsic = 0
+            pruned_extrinsic = 0
+            for slot_classes in self.classes:
+                slot_candidates = []
+                for section_class in slot_classes:
+                    if section_class.internal_conflict:
+                        pruned_intrinsic += 1
+                        continue
+                    if any(extrinsic[p] for p in section_class.patterns):
+                        pruned_extrinsic += 1
+                        continue
+                    modality_score = 0
+                    for index in section_class.members[0]:
+                        preferred_modality = preferences.get(self._course[index])
+                        if preferred_modality and self._method[index] != preferred_modality:
+                            modality_score += 1
+                    campus_days = 0
+                    for index in section_class.members[0]:
+                        campus_days |= self._campus_days[index]
+                    slot_candidates.append((section_class, modality_score, campus_days))
+                candidates.append(slot_candidates)
+
+        # Search the most constrained courses first
+        with stage(stats, "enumeration"):
+            if self.precomputed is not None and self.precomputed["gap_config"] == (break_start, break_end, max_allowed_gap):
+                found, counters = self._score_precomputed(candidates, weights, day_weights, top_k)
+            else:
+                found, counters = self._search(candidates, weights, day_weights, break_start, break_end, max_allowed_gap, top_k, progress)
+            if progress is not None:
+                progress({
+                    **counters, "best_score": min((leaf[0] for leaf in found), default=None), "improved": True,
+                    "snapshot": lambda: self._expand(sorted(found, key=lambda leaf: (leaf[0], leaf[1])), top_k),
+                })
+
+        # Expand the surviving classes into concrete schedules, best first
+        with stage(stats, "scoring"):
+            found.sort(key=lambda leaf: (leaf[0], leaf[1]))
+            results = self._expand(found, top_k, progress)
+
+        if stats is not None:
+            for slot_entry, slot_candidates in zip(self.selected_courses, candidates):
+                stats.candidates_per_course[' / '.join(slot_courses(slot_entry))] = sum(len(c[0].members) for c in slot_candidates)
+            stats.count("pruned_intrinsic", pruned_intrinsic + counters["pruned_intrinsic"])
+            stats.count("pruned_extrinsic", pruned_extrinsic)
+            stats.count("pruned_bound", counters["pruned_bound"])
+            stats.count("partial_schedules_explored", counters["explored"])
+            stats.count("valid_schedules", counters["valid"])
+            stats.count("emitted_schedules", len(results))
+        return results
+
+    def _expand(self, found, top_k, progress=None):
+        """
+        Expand sorted leaves (combined, seq, classes_by_slot, modality_score, days_score, gap_score) into a
+        ScheduleResults of concrete schedules, up to top_k. progress is only checked for cancellation here.
+        """
+        results = ScheduleResults(self.sections, 2 * len(self.selected_courses))
+        for position, (combined, seq, classes_by_slot, modality_score, days_score, gap_score) in enumerate(found):
+            if progress is not None and position % PROGRESS_EVERY == PROGRESS_EVERY - 1:
+                progress(None)
+            score_id = results.add_scores((combined, modality_score, days_score, gap_score))
+            for options in product(*[section_class.members for section_class in classes_by_slot]):
+                results.append([option[0] for option in options] + [option[1] for option in options if len(option) > 1], score_id)
+                if top_k is not None and len(results) >= top_k:
+                    break
+            if top_k is not None and len(results) >= top_k:
+                break
+        return results
+
+    def _score_leaf(self, classes_by_slot, modality_score, campus_days, weights, day_weights, break_start, break_end, max_allowed_gap):
+        """
+        (combined, days_score, gap_score) of one complete schedule.
+        """
+        days_score = day_weights.get(bin(campus_days).count('1'), max(day_weights.values()))
+        gap_score = self._gap_score(self._ordered_members(classes_by_slot), break_start, break_end, max_allowed_gap)
+        combined = weights["modality"] * modality_score + weights["days"] * days_score + weights["gaps"] * gap_score
+        return combined, days_score, gap_score
+
+    def _score_precomputed(self, candidates, weights, day_weights, top_k):
+        """
+        Counterpart of _search for a session with precomputed combinations, without any per-combination work
+        before the output. Bitmasks over the stored combinations give the ones that survive the availability
+        filter (one AND per slot of the candidate class masks), their modality score (summed slot by slot)
+        and their stored (campus days, gap score) bucket; every (modality, bucket) group has a single score,
+        so the groups are ranked and only the rows of the best groups, up to top_k schedules, are expanded.
+        Same return value as _search.
+        """
+        precomputed = self.precomputed
+        combinations, width = precomputed["combinations"], precomputed["width"]
+        live_by_stored, slot_order = precomputed["live_by_stored"], precomputed["slot_order"]
+        candidate_modality = {id(section_class): modality_score
+                              for slot_candidates in candidates for section_class, modality_score, _ in slot_candidates}
+
+        # Combinations by modality score, among the ones whose classes are all candidates
+        by_modality = {0: -1}
+        for live, masks in zip(live_by_stored, precomputed["class_masks"]):
+            slot_by_modality = {}
+            for section_class, mask in zip(live, masks):
+                modality_score = candidate_modality.get(id(section_class)) if section_class is not None else None
+                if modality_score is not None:
+                    slot_by_modality[modality_score] = slot_by_modality.get(modality_score, 0) | mask
+            next_by_modality = {}
+            for total, mask in by_modality.items():
+                for modality_score, slot_mask in slot_by_modality.items():
+                    combined_mask = mask & slot_mask
+                    if combined_mask:
+                        next_by_modality[total + modality_score] = next_by_modality.get(total + modality_score, 0) | combined_mask
+            by_modality = next_by_modality
+
+        max_day_weight = max(day_weights.values())
+        groups = {}
+        for modality_score, mask in by_modality.items():
+            for days, gap_score, bucket_mask in precomputed["buckets"]:
+                group_mask = mask & bucket_mask
+                if group_mask:
+                    days_score = day_weights.get(days, max_day_weight)
+                    combined = weights["modality"] * modality_score + weights["days"] * days_score + weights["gaps"] * gap_score
+                    groups.setdefault(combined, []).append((group_mask, modality_score, days_score, gap_score))
+
+        # Counted per class combination, not per schedule
+        surviving = sum(bin(mask).count('1') for mask in by_modality.values())
+        counters = {"explored": 0, "pruned_intrinsic": 0, "pruned_bound": 0, "valid": surviving}
+        found = []
+        kept = 0
+        for combined in sorted(groups):
+            if top_k is not None and kept >= top_k:
+                break
+            rows = []
+            for group_mask, modality_score, days_score, gap_score in groups[combined]:
+                bits = bin(group_mask)[:1:-1]  # least significant bit (row 0) first
+                row = bits.find('1')
+                while row != -1:
+                    rows.append((row, modality_score, days_score, gap_score))
+                    row = bits.find('1', row + 1)
+            rows.sort()
+            for row, modality_score, days_score, gap_score in rows:
+                if top_k is not None and kept >= top_k:
+                    break
+                classes_by_slot = [live[combinations[row * width + stored_slot]] for live, stored_slot in zip(live_by_stored, slot_order)]
+                multiplicity = 1
+                for section_class in classes_by_slot:
+                    multiplicity *= len(section_class.members)
+                kept += multiplicity
+                found.append((combined, row, classes_by_slot, modality_score, days_score, gap_score))
+        counters["explored"] = len(found)
+        counters["pruned_bound"] = surviving - len(found)
+        return found, counters
+
+    def _search(self, candidates, weights, day_weights, break_start, break_end, max_allowed_gap, top_k, progress=None):
+        """
+        Backtracking search over one class per course slot, rejecting classes that conflict with the ones
+        already chosen. With top_k, partial schedules whose score lower bound exceeds the current k-th best
+        are cut off. Returns the complete schedules reached as
+        (combined, seq, classes_by_slot, modality_score, days_score, gap_score) and the search counters.
+        """
+        max_day_weight = max(day_weights.values())
+        order = sorted(range(len(candidates)), key=lambda slot: len(candidates[slot]))
+        min_modality_after = [0] * (len(order) + 1)
+        for depth in range(len(order) - 1, -1, -1):
+            slot_candidates = candidates[order[depth]]
+            min_modality_after[depth] = min_modality_after[depth + 1] + (min(c[1] for c in slot_candidates) if slot_candidates else 0)
+        day_lower_bound = [
+            min([weight for count, weight in day_weights.items() if count >= days] + [max_day_weight])
+            for days in range(len(self._day_tokens) + 1)
+        ]
+        can_prune = top_k is not None and all(weight >= 0 for weight in weights.values())
+
+        leaves = []  # heap of (-combined, -seq, multiplicity) for the best leaves when top_k is set
+        kept = [0]
+        found = []
+        chosen = [None] * len(order)
+        counters = {"explored": 0, "pruned_intrinsic": 0, "pruned_bound": 0, "valid": 0}
+
+        best = [None, False]  # best combined score so far, top schedules changed since the last progress call
+
+        def threshold():
+            return -leaves[0][0] if kept[0] >= top_k else None
+
+        def snapshot():
+            current = sorted(found, key=lambda leaf: (leaf[0], leaf[1]))
+            if top_k is not None:
+                limit = threshold()
+                current = [leaf for leaf in current if limit is None or leaf[0] <= limit]
+            return self._expand(current, top_k)
+
+        def report():
+            progress({**counters, "best_score": best[0], "improved": best[1], "snapshot": snapshot})
+            best[1] = False
+
+        def search(depth, occupied, used_courses, modality_score, campus_days):
+            counters["explored"] += 1
+            if progress is not None and counters["explored"] % PROGRESS_EVERY == 0:
+                report()
+            if depth == len(order):
+                classes_by_slot = [None] * len(order)
+                multiplicity = 1
+                for position, section_class in enumerate(chosen):
+                    classes_by_slot[order[position]] = section_class
+                    multiplicity *= len(section_class.members)
+                counters["valid"] += multiplicity
+                combined, days_score, gap_score = self._score_leaf(
+                    classes_by_slot, modality_score, campus_days, weights, day_weights, break_start, break_end, max_allowed_gap
+                )
+                seq = len(found)
+                if top_k is not None:
+                    limit = threshold()
+                    if limit is not None and combined >= limit:
+                        counters["pruned_bound"] += 1
+                        return
+                    heapq.heappush(leaves, (-combined, -seq, multiplicity))
+                    kept[0] += multiplicity
+                    while kept[0] - leaves[0][2] >= top_k:
+                        kept[0] -= heapq.heappop(leaves)[2]
+                found.append((combined, seq, classes_by_slot, modality_score, days_score, gap_score))
+                if best[0] is None or combined < best[0] or top_k is not None:
+                    best[0] = combined if best[0] is None else min(best[0], combined)
+                    best[1] = True
+                return
+
+            if can_prune:
+                limit = threshold()
+                if limit is not None:
+                    bound = (weights["modality"] * (modality_score + min_modality_after[depth]) +
+                             weights["days"] * day_lower_bound[bin(campus_days).count('1')])
+                    if bound > limit:
+                        counters["pruned_bound"] += 1
+                        return
+
+            for section_class, class_modality, class_days in candidates[order[depth]]:
+                if section_class.conflict_mask & occupied or section_class.course_mask & used_courses:
+                    counters["pruned_intrinsic"] += 1
+                    continue
+                chosen[depth] = section_class
+                search(depth + 1, occupied | section_class.pattern_mask, used_courses | section_class.course_mask,
+                       modality_score + class_modality, campus_days | class_days)
+
+        search(0, 0, 0, 0, 0)
+        return found, counters
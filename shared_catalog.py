@@ -0,0 +1,310 @@
+# Compact, read-only copy of the open sections of the catalog in one multiprocessing.shared_memory block.
+# A parent process publishes it once (SharedCatalog.publish); worker processes attach by name and read the
+# section values, parsed meeting times, dates and the course / section-name indexes straight from the shared
+# buffer through typed memoryviews, without querying the database, pickling or parsing times again.
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from multiprocessing import parent_process, resource_tracker, shared_memory
+
+from catalog import OPEN_SECTIONS_QUERY
+from instrumentation import stage
+from main import default_config
+from session import ScheduleSession, flatten_courses, parse_date, parse_minutes, split_meetings
+
+MAGIC = b'SCHEDCAT'
+FORMAT_VERSION = 1
+EPOCH = datetime(1970, 1, 1)
+NO_TIME = -1  # meeting start/end of sections without a time ('nan')
+
+# Kinds of stored column values
+NONE_VALUE, INT_VALUE, FLOAT_VALUE, TEXT_VALUE = range(4)
+
+# Segments of the block, in layout order: (name, array typecode)
+SEGMENTS = [
+    ('value_kinds', 'b'),       # per section and column, one of the kinds above
+    ('numbers', 'd'),           # per section and column, the value of int / float columns
+    ('text_offsets', 'q'),      # per section and column, start of the value in text (plus a final end offset)
+    ('course_starts', 'i'),     # sections are grouped by course: first section of each course (plus the end)
+    ('course_offsets', 'q'),    # start of each course name in text (plus a final end offset)
+    ('name_order', 'i'),        # section positions sorted by Name
+    ('meeting_starts', 'i'),    # first meeting of each section (plus the end)
+    ('meeting_days', 'B'),      # day token of each meeting, index into the day tokens
+    ('meeting_start_times', 'h'),  # minutes after midnight, NO_TIME if unknown
+    ('meeting_end_times', 'h'),
+    ('start_dates', 'q'),       # SDate / EDate of each section, in seconds since EPOCH
+    ('end_dates', 'q'),
+    ('day_offsets', 'q'),       # start of each day token in text (plus a final end offset)
+    ('text', 'B'),              # UTF-8 strings: text values, then course names, then day tokens
+]
+HEADER = struct.Struct(f'<8sIII{2 * len(SEGMENTS)}q')  # magic, version, sections, columns, (offset, count) per segment
+
+def to_seconds(value):
+    return int((value - EPOCH).total_seconds())
+
+published_blocks = set()  # blocks created by this process
+
+def attach_shared_memory(name):
+    """
+    Attach to an existing block without letting this process's resource tracker unlink it at exit.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    # Workers started by multiprocessing share the publisher's resource tracker, where the block is already
+    # registered; an unrelated process has its own tracker, which would unlink the block when it exits.
+    if parent_process() is None and shm._name not in published_blocks:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+class SharedCatalog:
+    """
+    The open sections of the catalog (Status 'A', seats left) in shared memory.
+
+    In the parent:  shared = SharedCatalog.publish(cursor); pass shared.name to the workers; shared.close() at the end.
+    In a worker:    shared = SharedCatalog.attach(name), or init_worker(name) as a process pool initializer.
+    Then shared.generate_schedules(...) works like main.generate_schedules, without a database connection.
+    The block is a snapshot: publish a new one after generate_db.py reloads the catalog.
+    """
+    def __init__(self, shm, owner=False):
+        self._shm = shm
+        self.owner = owner
+        magic, version, self.section_count, self.column_count, *layout = HEADER.unpack_from(shm.buf)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{shm.name} is not a shared catalog (format {FORMAT_VERSION})")
+        self._views = {}
+        for (segment, typecode), offset, count in zip(SEGMENTS, layout[0::2], layout[1::2]):
+            raw = shm.buf[offset:offset + count * struct.calcsize(typecode)]
+            self._views[segment] = (raw, raw.cast(typecode))
+            setattr(self, segment, self._views[segment][1])
+        self.columns = self._text(self.day_offsets[-1], len(self.text)).split('\n')  # column names close the text
+        self.day_tokens = [self._text(self.day_offsets[i], self.day_offsets[i + 1]) for i in range(len(self.day_offsets) - 1)]
+        self.course_names = [self._text(self.course_offsets[i], self.course_offsets[i + 1]) for i in range(len(self.course_offsets) - 1)]
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @classmethod
+    def publish(cls, cursor, name=None):
+        """
+        Read the open sections once, lay them out in a new shared memory block and return its owner.
+        """
+        cursor.execute(OPEN_SECTIONS_QUERY)
+        columns = [desc[0] for desc in cursor.description][1:]
+        rows = sorted(cursor.fetchall(), key=lambda row: row[0])  # stable: catalog order within a course
+
+        data = {segment: [] for segment, _ in SEGMENTS}
+        text = bytearray()
+        course_names = []
+        day_tokens = {}
+        for position, (course, *values) in enumerate(rows):
+            if not course_names or course_names[-1] != course:
+                course_names.append(course)
+                data['course_starts'].append(position)
+            for value in values:
+                data['text_offsets'].append(len(text))
+                if value is None:
+                    data['value_kinds'].append(NONE_VALUE)
+                    data['numbers'].append(0.0)
+                elif isinstance(value, str):
+                    data['value_kinds'].append(TEXT_VALUE)
+                    data['numbers'].append(0.0)
+                    text += value.encode()
+                else:
+                    data['value_kinds'].append(INT_VALUE if isinstance(value, int) else FLOAT_VALUE)
+                    data['numbers'].append(float(value))
+
+            section = dict(zip(columns, values))
+            data['meeting_starts'].append(len(data['meeting_days']))
+            for day, start, end in split_meetings(
+                section["Mtg_Days"], section.get("STime_Extra") or section["STime"], section.get("ETime_Extra") or section["ETime"]
+            ):
+                start, end = parse_minutes(start), parse_minutes(end)
+                data['meeting_days'].append(day_tokens.setdefault(day, len(day_tokens)))
+                data['meeting_start_times'].append(NO_TIME if start is None else start)
+                data['meeting_end_times'].append(NO_TIME if end is None else end)
+            data['start_dates'].append(to_seconds(parse_date(section["SDate"])))
+            data['end_dates'].append(to_seconds(parse_date(section["EDate"])))
+
+        data['text_offsets'].append(len(text))
+        data['course_starts'].append(len(rows))
+        data['meeting_starts'].append(len(data['meeting_days']))
+        data['name_order'] = sorted(range(len(rows)), key=lambda position: rows[position][1])
+        for course in course_names:
+            data['course_offsets'].append(len(text))
+            text += course.encode()
+        data['course_offsets'].append(len(text))
+        for day in day_tokens:
+            data['day_offsets'].append(len(text))
+            text += day.encode()
+        data['day_offsets'].append(len(text))
+        text += '\n'.join(columns).encode()
+        data['text'] = text
+
+        segments = [(segment, typecode, memoryview(bytes(data[segment])) if segment == 'text' else
+                     memoryview(array(typecode, data[segment])).cast('B'))
+                    for segment, typecode in SEGMENTS]
+        layout = []
+        offset = HEADER.size
+        for segment, typecode, payload in segments:
+            offset += -offset % 8  # keep every segment aligned for its typecode
+            layout += [offset, len(payload) // struct.calcsize(typecode)]
+            offset += len(payload)
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=max(offset, 1))
+        published_blocks.add(shm._name)
+        HEADER.pack_into(shm.buf, 0, MAGIC, FORMAT_VERSION, len(rows), len(columns), *layout)
+        for (segment, typecode, payload), start in zip(segments, layout[0::2]):
+            shm.buf[start:start + len(payload)] = payload
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        return cls(attach_shared_memory(name))
+
+    def close(self):
+        """
+        Detach from the block; the owner (the publishing process) also frees it.
+        """
+        for raw, view in self._views.values():
+            view.release()
+            raw.release()
+        self._views.clear()
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+            published_blocks.discard(self._shm._name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _text(self, start, end):
+        return bytes(self.text[start:end]).decode()
+
+    def section(self, position):
+        """
+        The section at position as a dict, in the shape main.retrieve_section_info returns.
+        """
+        section = {}
+        base = position * self.column_count
+        for column, cell in zip(self.columns, range(base, base + self.column_count)):
+            kind = self.value_kinds[cell]
+            if kind == TEXT_VALUE:
+                section[column] = self._text(self.text_offsets[cell], self.text_offsets[cell + 1])
+            elif kind == INT_VALUE:
+                section[column] = int(self.numbers[cell])
+            elif kind == FLOAT_VALUE:
+                section[column] = self.numbers[cell]
+            else:
+                section[column] = None
+        return section
+
+    def section_pattern(self, position):
+        """
+        Parsed (meetings, start date, end date) of the section at position, as session.ScheduleSession uses them.
+        """
+        meetings = tuple(
+            (self.day_tokens[self.meeting_days[meeting]],
+             None if self.meeting_start_times[meeting] == NO_TIME else self.meeting_start_times[meeting],
+             None if self.meeting_end_times[meeting] == NO_TIME else self.meeting_end_times[meeting])
+            for meeting in range(self.meeting_starts[position], self.meeting_starts[position + 1])
+        )
+        return (meetings, EPOCH + timedelta(seconds=self.start_dates[position]),
+                EPOCH + timedelta(seconds=self.end_dates[position]))
+
+    def course_sections(self, course):
+        """
+        Positions of the open sections of a course, in catalog order.
+        """
+        i = bisect_left(self.course_names, course)
+        if i == len(self.course_names) or self.course_names[i] != course:
+            return range(0)
+        return range(self.course_starts[i], self.course_starts[i + 1])
+
+    def find_section(self, section_name):
+        """
+        Position of the open section with this Name, or None.
+        """
+        low, high = 0, len(self.name_order)
+        name_column = self.columns.index("Name")
+        while low < high:
+            middle = (low + high) // 2
+            cell = self.name_order[middle] * self.column_count + name_column
+            if self._text(self.text_offsets[cell], self.text_offsets[cell + 1]) < section_name:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self.name_order):
+            position = self.name_order[low]
+            cell = position * self.column_count + name_column
+            if self._text(self.text_offsets[cell], self.text_offsets[cell + 1]) == section_name:
+                return position
+        return None
+
+    def sections_info(self, courses):
+        """
+        Same result as main.retrieve_section_info followed by main.process_corequisites, plus the parsed
+        pattern of every section returned, keyed by Name (see ScheduleSession's section_patterns).
+        """
+        sections_info = {}
+        section_patterns = {}
+        processed_sections = set()
+        for course in courses:
+            sections_info[course] = []
+            for position in self.course_sections(course):
+                section = self.section(position)
+                section_name = section["Name"]
+                if section_name in processed_sections:
+                    continue
+                processed_sections.add(section_name)
+                section_patterns[section_name] = self.section_pattern(position)
+                specific_coreqs = []
+                if section["Corequisite"]:
+                    for coreq in section["Corequisite"].split(','):
+                        coreq_position = self.find_section(coreq.strip())
+                        if coreq_position is not None:
+                            coreq_section = self.section(coreq_position)
+                            specific_coreqs.append(coreq_section)
+                            processed_sections.add(coreq_section["Name"])
+                            section_patterns[coreq_section["Name"]] = self.section_pattern(coreq_position)
+                sections_info[course].append((section, specific_coreqs))
+        return sections_info, section_patterns
+
+    def open_session(self, selected_courses, stats=None):
+        """
+        Like main.open_session, reading from shared memory instead of the database.
+        """
+        with stage(stats, "coreqs"):
+            sections_info, section_patterns = self.sections_info(flatten_courses(selected_courses))
+            return ScheduleSession(selected_courses, sections_info, section_patterns)
+
+    def generate_schedules(self, selected_courses, modality_preferences, unavailability_blocks, config=None, top_k=None, stats=None):
+        """
+        Like main.generate_schedules, reading from shared memory instead of the database.
+        """
+        if config is None:
+            config = default_config(modality_preferences)
+        return self.open_session(selected_courses, stats).run(unavailability_blocks, config, top_k, stats)
+
+# Catalog of a worker process, set by init_worker
+worker_catalog = None
+
+def init_worker(name):
+    """
+    Process pool initializer: attach the worker to the published catalog.
+    Example: ProcessPoolExecutor(initializer=init_worker, initargs=(shared.name,))
+    """
+    global worker_catalog
+    worker_catalog = SharedCatalog.attach(name)
+
+def worker_generate_schedules(selected_courses, modality_preferences, unavailability_blocks, config=None, top_k=None):
+    """
+    generate_schedules on the worker's attached catalog (submit this to the process pool).
+    """
+    return worker_catalog.generate_schedules(selected_courses, modality_preferences, unavailability_blocks, config, top_k)
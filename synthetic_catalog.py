@@ -0,0 +1,150 @@
+# Synthetic course catalogs shaped like the master schedule export (sample_schedule_SP24_6.csv)
+# Used by benchmark.py to run the scheduler on catalogs of controlled size without real data.
+import csv
+import random
+import sqlite3
+from datetime import datetime
+
+# Most common (Mtg_Days, STime, ETime) patterns of the sample schedule
+DEFAULT_MEETING_PATTERNS = [
+    ('T, TH', '9:35 AM', '11:00 AM'),
+    ('T, TH', '11:10 AM', '12:35 PM'),
+    ('T, TH', '12:45 PM', '2:10 PM'),
+    ('M, W', '1:30 PM', '2:55 PM'),
+    ('M, W', '9:35 AM', '11:00 AM'),
+    ('T, TH', '2:20 PM', '3:45 PM'),
+    ('M, W', '3:05 PM', '4:30 PM'),
+    ('T, TH', '8:00 AM', '9:25 AM'),
+    ('M, W, F', '11:15 AM', '12:10 PM'),
+    ('M, W, F', '10:10 AM', '11:05 AM'),
+    ('M, W, F', '9:05 AM', '10:00 AM'),
+    ('M, W', '8:00 AM', '9:25 AM'),
+    ('T', '6:00 PM', '8:55 PM'),
+    ('M', '6:00 PM', '8:55 PM'),
+    ('W', '9:05 AM', '12:00 PM'),
+]
+
+# (SDate, EDate, share of sections): full semester, first and second 7-week sessions
+DEFAULT_SESSIONS = [
+    ('2024-08-26', '2024-12-07', 0.90),
+    ('2024-08-26', '2024-10-14', 0.05),
+    ('2024-10-16', '2024-12-07', 0.05),
+]
+
+SUBJECTS = ['ART', 'BIO', 'CHE', 'ECO', 'ENG', 'HIS', 'MAT', 'PHY', 'PSY', 'SOC']
+
+# Cleaned column names, in the order generate_db.py writes them
+COLUMNS = [
+    'Date_Run', 'Sub', 'Term', 'Dept', 'Course_Sections_Id', 'Name', 'Short_Title', 'Cap', 'Avail_Seats',
+    'Student_Count', 'Waitlist_Count', 'Credits', 'Status', 'Status_Date', 'Mtg_Days', 'STime', 'ETime',
+    'Faculty_First', 'Faculty_Last', 'Faculty_Email', 'SDate', 'EDate', 'Xlist', 'Hidden_Y_N', 'Petition_Y_N',
+    'Printed_Comments', 'Method', 'Type', 'Location', 'Room', 'Number_Weeks', 'CIP_Code', 'Sec_Course_Types',
+    'STime_Extra', 'ETime_Extra', 'Course_Name', 'Corequisite', 'Meets_With', 'Restricted_section', 'Cohort'
+]
+
+# Header of the raw export, for the columns it contains
+RAW_HEADER = {
+    'Date_Run': 'Date Run', 'Course_Sections_Id': 'Course Sections Id', 'Short_Title': 'Short Title',
+    'Avail_Seats': 'Avail Seats', 'Student_Count': 'Student Count', 'Waitlist_Count': 'Waitlist Count ',
+    'Status_Date': 'Status Date', 'Mtg_Days': 'Mtg Days', 'Faculty_First': 'Faculty First',
+    'Faculty_Last': 'Faculty Last', 'Faculty_Email': 'Faculty Email', 'Hidden_Y_N': 'Hidden Y/N',
+    'Petition_Y_N': 'Petition Y/N', 'Printed_Comments': 'Printed Comments', 'Number_Weeks': '# Weeks',
+    'CIP_Code': 'CIP Code', 'Sec_Course_Types': 'Sec Course Types',
+}
+RAW_COLUMNS = COLUMNS[:COLUMNS.index('STime_Extra')]
+
+def generate_catalog(num_courses=20, sections_per_course=6, coreq_share=0.2, meeting_patterns=None,
+                     sessions=None, online_share=0.15, full_share=0.1, seed=0):
+    '''
+    Generate cleaned catalog rows (dicts keyed by COLUMNS).
+    coreq_share of the courses get a companion lab course (e.g. BIO-101L); every lecture section then lists
+    one to three of its lab sections as co-requisites, the way the real Printed Comments do.
+    full_share of the sections have no available seats.
+    '''
+    rng = random.Random(seed)
+    meeting_patterns = meeting_patterns or DEFAULT_MEETING_PATTERNS
+    sessions = sessions or DEFAULT_SESSIONS
+    rows = []
+
+    def add_section(course_name, number, method, pattern, session, short_title, comments=''):
+        days, start, end = pattern if method != 'ONLIN' else ('nan', 'nan', 'nan')
+        cap = rng.choice([16, 20, 24, 28, 32])
+        avail_seats = 0 if rng.random() < full_share else rng.randint(1, cap)
+        sub = course_name.split('-')[0]
+        rows.append({
+            'Date_Run': '2024-05-23 00:00:00', 'Sub': sub, 'Term': 'UG24FA', 'Dept': sub,
+            'Course_Sections_Id': 100000 + len(rows), 'Name': f'{course_name}-{number}', 'Short_Title': short_title,
+            'Cap': cap, 'Avail_Seats': avail_seats, 'Student_Count': cap - avail_seats, 'Waitlist_Count': 0,
+            'Credits': 1.0 if course_name.endswith('L') else 3.0, 'Status': 'A', 'Status_Date': '2024-01-23 00:00:00',
+            'Mtg_Days': days, 'STime': start, 'ETime': end, 'Faculty_First': 'nan', 'Faculty_Last': 'nan',
+            'Faculty_Email': None, 'SDate': f'{session[0]} 00:00:00', 'EDate': f'{session[1]} 00:00:00',
+            'Xlist': None, 'Hidden_Y_N': None, 'Petition_Y_N': 'N', 'Printed_Comments': comments or 'nan',
+            'Method': method, 'Type': 'nan', 'Location': 'MC', 'Room': 'nan', 'Number_Weeks': 14,
+            'CIP_Code': 24.0101, 'Sec_Course_Types': 'LAS', 'STime_Extra': start, 'ETime_Extra': end,
+            'Course_Name': course_name, 'Corequisite': '', 'Meets_With': '', 'Restricted_section': '', 'Cohort': 0,
+        })
+        return rows[-1]
+
+    def pick_session():
+        threshold = rng.random() * sum(share for _, _, share in sessions)
+        for start_date, end_date, share in sessions:
+            threshold -= share
+            if threshold <= 0:
+                return (start_date, end_date)
+        return sessions[-1][:2]
+
+    for i in range(num_courses):
+        course_name = f'{SUBJECTS[i % len(SUBJECTS)]}-{101 + i // len(SUBJECTS)}'
+        title = f'Synthetic Course {i + 1}'
+        lab_names = []
+        if rng.random() < coreq_share:
+            lab_names = [f'{course_name}L-{301 + k}' for k in range(sections_per_course)]
+            for lab_name in lab_names:
+                add_section(course_name + 'L', lab_name.rsplit('-', 1)[1], 'LAB', rng.choice(meeting_patterns), pick_session(), title + ' Lab')
+        for k in range(sections_per_course):
+            method = 'ONLIN' if rng.random() < online_share else 'LEC'
+            section = add_section(course_name, str(101 + k), method, rng.choice(meeting_patterns), pick_session(), title)
+            if lab_names:
+                coreqs = rng.sample(lab_names, rng.randint(1, min(3, len(lab_names))))
+                section['Printed_Comments'] = f"Co-requisite: {', '.join(coreqs)}."
+                section['Corequisite'] = ', '.join(coreqs)
+    return rows
+
+def course_names(rows):
+    '''Courses of a synthetic catalog that students can request (companion labs excluded).'''
+    return list(dict.fromkeys(row['Course_Name'] for row in rows if not row['Course_Name'].endswith('L')))
+
+def build_database(rows, db_name=':memory:'):
+    '''Load the rows into an SQLite database with the same table and indexes as generate_db.import_to_sqlite.'''
+    conn = sqlite3.connect(db_name)
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS schedule")
+    cursor.execute(f"CREATE TABLE schedule ({', '.join(COLUMNS)})")
+    cursor.executemany(
+        f"INSERT INTO schedule VALUES ({', '.join('?' for _ in COLUMNS)})",
+        [tuple(row[column] for column in COLUMNS) for row in rows]
+    )
+    cursor.execute("CREATE INDEX idx_course_name ON schedule (Course_Name)")
+    cursor.execute("CREATE INDEX idx_name ON schedule (Name)")
+    cursor.execute("CREATE INDEX idx_status ON schedule (Status)")
+    cursor.execute("CREATE INDEX idx_avail_seats ON schedule (Avail_Seats)")
+    conn.commit()
+    return conn
+
+def write_csv(rows, file_name):
+    '''Write the rows in the shape of the raw master schedule export, ready for generate_db.py.'''
+    def raw_value(column, value):
+        if value is None or value == 'nan':
+            return ''
+        if column in ('Date_Run', 'Status_Date', 'SDate', 'EDate'):
+            parsed = datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+            return f'{parsed.month}/{parsed.day}/{parsed.year}'
+        if column in ('STime', 'ETime'):
+            return f' {value}'
+        return value
+
+    with open(file_name, 'w', newline='', encoding='utf-8-sig') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow([RAW_HEADER.get(column, column) for column in RAW_COLUMNS])
+        for row in rows:
+            writer.writerow([raw_value(column, row[column]) for column in RAW_COLUMNS])
@@ -0,0 +1,63 @@
+import os
+import unittest
+from collections import Counter
+
+from allocation import allocate_sections, open_session_without, plan_cohort
+from catalog import connect
+from loadtest import synthetic_requests
+from main import default_config, process_corequisites, retrieve_section_info
+from service import parse_cohort
+from session import flatten_courses
+
+DB_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule.db')
+
+class AllocateSectionsTest(unittest.TestCase):
+    def test_capacities_respected(self):
+        options = [[(0, ["A-1", "B-1"]), (1, ["A-2", "B-1"]), (2, ["A-2", "B-2"])] for _ in range(6)]
+        choices, _ = allocate_sections(options, {"A-1": 2, "A-2": 2, "B-1": 3, "B-2": 1})
+        load = Counter(name for student, choice in zip(options, choices) if choice is not None
+                       for name in student[choice][1])
+        self.assertLessEqual(load["A-1"], 2)
+        self.assertLessEqual(load["A-2"], 2)
+        self.assertLessEqual(load["B-1"], 3)
+        self.assertLessEqual(load["B-2"], 1)
+        self.assertEqual(sum(choice is not None for choice in choices), 4)
+
+class PlanCohortTest(unittest.TestCase):
+    def setUp(self):
+        self.conn = connect(DB_NAME)
+        self.cursor = self.conn.cursor()
+        self.addCleanup(self.conn.close)
+        self.seats = dict(self.cursor.execute("SELECT Name, Avail_Seats FROM schedule").fetchall())
+
+    def assertSeatsRespected(self, placements):
+        load = Counter(name for placement in placements for name in placement["sections"])
+        for name, taken in load.items():
+            self.assertLessEqual(taken, self.seats[name], name)
+        return load
+
+    def test_identical_requests_beyond_top_options(self):
+        students = [{"id": number, "courses": ["ENG-103", "PSY-103"]} for number in range(300)]
+        placements, summary = plan_cohort(self.cursor, students, options_per_student=20)
+        self.assertSeatsRespected(placements)
+        self.assertEqual(summary["placed"], 300)
+        self.assertGreater(summary["retry_searches"], 0)
+
+    def test_unplaced_students_have_no_schedule_left(self):
+        students, _ = parse_cohort({"students": synthetic_requests(self.cursor, 300, seed=1)})
+        placements, summary = plan_cohort(self.cursor, students, options_per_student=5)
+        load = self.assertSeatsRespected(placements)
+        self.assertEqual(summary["placed"] + summary["unplaced"], 300)
+        full = {name for name, taken in load.items() if taken >= self.seats[name]}
+        for student, placement in zip(students, placements):
+            if placement["score"] is not None:
+                continue
+            courses = student["courses"]
+            sections_info, section_columns = retrieve_section_info(self.cursor, flatten_courses(courses))
+            sections_info, _ = process_corequisites(self.cursor, sections_info, section_columns)
+            session = open_session_without(sections_info, courses, full)
+            config = default_config(student["modality_preferences"])
+            self.assertEqual(len(session.run(student["unavailability_blocks"], config, 1)), 0, student["id"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from async_search import AsyncScheduler
+from catalog import CatalogPool, connect
+from main import generate_schedules
+
+DB_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule.db')
+LARGE_REQUEST = ["ENG-103", "COM-100", "PSY-103", "MAT-114", "SOC-103", "HIS-107"]  # ~12 million schedules
+
+def rendered(results):
+    return [([section["Name"] for section in results.combination(i)], results[i][1:]) for i in range(len(results))]
+
+class AsyncSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.pool = CatalogPool(DB_NAME)
+        self.executor = ThreadPoolExecutor(1)
+        self.addCleanup(self.pool.close)
+        self.addCleanup(self.executor.shutdown)
+
+    def scheduler(self, **intervals):
+        return AsyncScheduler(self.pool, self.executor, **intervals)
+
+    def test_results_match_generate_schedules(self):
+        courses, blocks = ["MAT-151", "BIO-171", "PSY-103"], {"Tue": [("12:00 AM", "10:00 AM")]}
+        results = asyncio.run(self.scheduler().generate_schedules(courses, {}, blocks, top_k=20))
+        conn = connect(DB_NAME)
+        self.addCleanup(conn.close)
+        self.assertEqual(rendered(results), rendered(generate_schedules(conn.cursor(), courses, {}, blocks, top_k=20)))
+
+    def test_events(self):
+        async def collect():
+            scheduler = self.scheduler(progress_interval=0, snapshot_interval=0)
+            return [event async for event in scheduler.search(["ENG-103", "COM-100", "PSY-103"], {}, {}, top_k=10)]
+
+        events = asyncio.run(collect())
+        types = [event["type"] for event in events]
+        self.assertEqual(types[-1], "done")
+        self.assertEqual(types.count("done"), 1)
+        self.assertIn("progress", types)
+        self.assertIn("snapshot", types)
+        final = events[-1]["results"]
+        self.assertEqual(len(final), 10)
+        last_snapshot = [event["results"] for event in events if event["type"] == "snapshot"][-1]
+        self.assertGreaterEqual(last_snapshot[0][1], final[0][1])
+
+    def test_break_cancels_search(self):
+        async def first_progress():
+            async for event in self.scheduler(progress_interval=0).search(LARGE_REQUEST, {}, {}, top_k=None):
+                if event["type"] == "progress":
+                    return event
+
+        self.assertIsNotNone(asyncio.run(first_progress()))
+        start = time.perf_counter()
+        self.executor.shutdown(wait=True)  # returns once the worker thread has stopped searching
+        self.assertLess(time.perf_counter() - start, 5.0)
+
+    def test_task_cancel_cancels_search(self):
+        async def cancel_soon():
+            task = asyncio.ensure_future(self.scheduler().generate_schedules(LARGE_REQUEST, {}, {}, top_k=None))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_soon())
+        start = time.perf_counter()
+        self.executor.shutdown(wait=True)
+        self.assertLess(time.perf_counter() - start, 5.0)
+
+    def test_errors_are_raised(self):
+        async def search():
+            return await self.scheduler().generate_schedules(["ENG-103"], {}, {"Mon": [("bad", "10:00 AM")]})
+
+        with self.assertRaises(ValueError):
+            asyncio.run(search())
+
+if __name__ == "__main__":
+    unittest.main()
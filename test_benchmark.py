@@ -0,0 +1,22 @@
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+
+import benchmark
+
+class BenchmarkTest(unittest.TestCase):
+    def test_run_suite(self):
+        report = benchmark.run_suite(min_courses=2, max_courses=3, sections_per_course=3, top_k=5, repeat=1)
+        self.assertEqual(len(report["results"]), 2 * len(benchmark.SCENARIOS))
+        for result in report["results"]:
+            self.assertLessEqual(result["emitted"], 5)
+            self.assertGreaterEqual(result["valid"], result["emitted"])
+
+    def test_repeat_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            benchmark.run_suite(min_courses=2, max_courses=2, sections_per_course=3, repeat=0)
+        with redirect_stderr(StringIO()), self.assertRaises(SystemExit):
+            benchmark.main(["--repeat", "0"])
+
+if __name__ == "__main__":
+    unittest.main()
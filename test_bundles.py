@@ -0,0 +1,71 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+import catalog
+from bundles import BUNDLE_TABLE
+from main import default_config, open_session
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+DB_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule.db')
+
+def schedules(results):
+    '''(indices, scores) of every ranked schedule, sorted so ties compare equal.'''
+    return sorted((tuple(result[0]), *result[1:]) for result in results)
+
+@unittest.skipIf(pandas is None, "generate_db needs pandas")
+class PrecomputedBundleTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import generate_db
+        cls.directory = tempfile.mkdtemp()
+        db_name = os.path.join(cls.directory, 'schedule.db')
+        shutil.copy(DB_NAME, db_name)
+        with redirect_stdout(StringIO()):
+            generate_db.precompute_bundles(db_name)
+        cls.conn = catalog.connect(db_name)
+        cls.bundles = [json.loads(row[0]) for row in cls.conn.execute(f"SELECT courses FROM {BUNDLE_TABLE}")]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+        shutil.rmtree(cls.directory)
+
+    def run_both(self, courses, unavailability_blocks, top_k=None):
+        '''Results of the stored combinations and of the live search for the same session.'''
+        session = open_session(self.conn.cursor(), courses)
+        self.assertIsNotNone(session.precomputed, courses)
+        config = default_config({courses[0]: "LEC"})
+        precomputed = session.run(unavailability_blocks, config, top_k)
+        session.precomputed = None
+        return precomputed, session.run(unavailability_blocks, config, top_k)
+
+    def test_bundles_stored(self):
+        self.assertGreater(len(self.bundles), 0)
+
+    def test_precomputed_matches_search(self):
+        blocks = {"Mon": [("12:00 AM", "10:00 AM")], "Thu": [("05:00 PM", "11:59 PM")]}
+        for courses in self.bundles:
+            for order in (courses, courses[::-1]):
+                for unavailability_blocks in ({}, blocks):
+                    with self.subTest(courses=order, blocked=bool(unavailability_blocks)):
+                        precomputed, searched = self.run_both(order, unavailability_blocks)
+                        self.assertEqual(schedules(precomputed), schedules(searched))
+
+    def test_precomputed_top_k_matches_search(self):
+        for courses in self.bundles:
+            for top_k in (1, 5, 20):
+                with self.subTest(courses=courses, top_k=top_k):
+                    precomputed, searched = self.run_both(courses, {}, top_k)
+                    self.assertEqual([result[1:] for result in precomputed], [result[1:] for result in searched])
+
+if __name__ == "__main__":
+    unittest.main()
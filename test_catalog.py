@@ -0,0 +1,77 @@
+import os
+import sqlite3
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from catalog import COURSE_SECTIONS_QUERY, CatalogPool, connect, get_catalog_version
+
+DB_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule.db')
+
+class ConnectTest(unittest.TestCase):
+    def test_read_only(self):
+        conn = connect(DB_NAME)
+        self.addCleanup(conn.close)
+        self.assertGreater(conn.execute("SELECT COUNT(*) FROM schedule").fetchone()[0], 0)
+        with self.assertRaises(sqlite3.OperationalError):
+            conn.execute("UPDATE schedule SET Avail_Seats = 0")
+        self.assertEqual(get_catalog_version(conn.cursor()), conn.execute("PRAGMA user_version").fetchone()[0])
+
+    def test_course_sections_are_open(self):
+        conn = connect(DB_NAME)
+        self.addCleanup(conn.close)
+        names = [row[0] for row in conn.execute(COURSE_SECTIONS_QUERY, ("ENG-103",))]
+        open_names = [row[0] for row in conn.execute(
+            "SELECT Name FROM schedule WHERE Course_Name = 'ENG-103' AND Status = 'A' AND Avail_Seats > 0")]
+        self.assertEqual(sorted(names), sorted(open_names))
+        self.assertGreater(len(names), 0)
+
+class CatalogPoolTest(unittest.TestCase):
+    def test_one_connection_per_thread(self):
+        with CatalogPool(DB_NAME) as pool:
+            self.assertIs(pool.connection(), pool.connection())
+            barrier = threading.Barrier(4)
+
+            def thread_connection(_):
+                barrier.wait()  # keep all four threads alive at once
+                conn = pool.connection()
+                conn.execute("SELECT COUNT(*) FROM schedule").fetchone()
+                return id(conn)
+
+            with ThreadPoolExecutor(4) as executor:
+                connections = set(executor.map(thread_connection, range(4)))
+            self.assertEqual(len(connections), 4)
+            self.assertNotIn(id(pool.connection()), connections)
+            self.assertEqual(len(pool._connections), 5)
+
+    def test_release(self):
+        pool = CatalogPool(DB_NAME)
+        self.addCleanup(pool.close)
+        conn = pool.connection()
+        pool.release()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        self.assertIsNot(pool.connection(), conn)
+        self.assertEqual(len(pool._connections), 1)
+
+    def test_closed_pool(self):
+        pool = CatalogPool(DB_NAME)
+        conn = pool.connection()
+        pool.close()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        errors = []
+
+        def use_pool():
+            try:
+                pool.cursor()
+            except sqlite3.ProgrammingError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=use_pool)
+        thread.start()
+        thread.join()
+        self.assertEqual(len(errors), 1)
+
+if __name__ == "__main__":
+    unittest.main()
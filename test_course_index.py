@@ -0,0 +1,51 @@
+import os
+import unittest
+
+from catalog import connect
+from course_index import CourseIndex
+
+DB_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule.db')
+
+class CourseIndexTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.conn = connect(DB_NAME)
+        cls.index = CourseIndex.from_cursor(cls.conn.cursor())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+
+    def query(self, sql, parameters=()):
+        return self.conn.execute(sql, parameters).fetchall()
+
+    def test_courses_match_catalog(self):
+        names = {name for name, in self.query("SELECT DISTINCT Course_Name FROM schedule")}
+        self.assertEqual(set(self.index.courses), names)
+        for name, open_sections in self.query("""
+                SELECT Course_Name, SUM(Status = 'A' AND Avail_Seats > 0) FROM schedule GROUP BY Course_Name"""):
+            self.assertEqual(self.index.get(name).open_sections, open_sections, name)
+
+    def test_modalities_of_open_sections(self):
+        methods = [method for method, in self.query("""
+            SELECT Method FROM schedule WHERE Course_Name = 'ENG-103' AND Status = 'A' AND Avail_Seats > 0 ORDER BY rowid""")]
+        self.assertEqual(self.index.available_modalities("ENG-103"), list(dict.fromkeys(methods)))
+        self.assertEqual(self.index.available_modalities("XYZ-999"), [])
+
+    def test_programs_skip_missing_codes(self):
+        self.assertNotIn("nan", self.index._programs)
+        self.assertEqual(self.index.program_courses("nan"), [])
+        self.assertIn("G23AR", self.index._programs)
+        self.assertEqual(self.index.program_courses(" geart "), self.index.program_courses("GEART"))
+        for course in self.index.courses.values():
+            self.assertNotIn("nan", course.programs)
+
+    def test_search_and_subjects(self):
+        self.assertEqual(self.index.search("bio-17"), sorted(name for name in self.index.courses if name.startswith("BIO-17")))
+        self.assertEqual(len(self.index.search("BIO", limit=3)), 3)
+        self.assertEqual(self.index.search("ZZZ"), [])
+        self.assertIn("ENG-103", self.index.subject_courses("eng"))
+        self.assertIn("ENG-103", self.index)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+try:
+    import pandas
+    import pyarrow
+except ImportError:
+    pandas = None
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_schedule_SP24_6.csv')
+
+def table_dump(db_name, table):
+    '''Every value of a table with its SQLite storage class, plus the declared column types.'''
+    conn = sqlite3.connect(db_name)
+    columns = [(row[1], row[2]) for row in conn.execute(f"PRAGMA table_info({table})")]
+    values = ', '.join(f"{name}, typeof({name})" for name, _ in columns)
+    rows = conn.execute(f"SELECT {values} FROM {table} ORDER BY rowid").fetchall()
+    conn.close()
+    return columns, rows
+
+@unittest.skipIf(pandas is None, "pandas and pyarrow are needed to ingest")
+class CleanedCatalogIngestTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        shutil.copy(SAMPLE_FILE, self.directory)
+        os.chdir(self.directory)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def ingest(self, file_name, db_name):
+        import generate_db
+        with redirect_stdout(StringIO()):
+            generate_db.main(file_name, db_name)
+
+    def test_cleaned_csv_matches_parquet(self):
+        self.ingest('sample_schedule_SP24_6.csv', 'raw.db')
+        self.ingest('cleaned_sample_schedule_SP24_6.parquet', 'parquet.db')
+        self.ingest('cleaned_sample_schedule_SP24_6.csv', 'csv.db')
+        self.assertEqual(table_dump('parquet.db', 'schedule'), table_dump('raw.db', 'schedule'))
+        self.assertEqual(table_dump('csv.db', 'schedule'), table_dump('parquet.db', 'schedule'))
+
+    def test_cleaned_csv_keeps_nan_placeholder(self):
+        self.ingest('sample_schedule_SP24_6.csv', 'raw.db')
+        self.ingest('cleaned_sample_schedule_SP24_6.csv', 'csv.db')
+        conn = sqlite3.connect('csv.db')
+        online = conn.execute("SELECT COUNT(*) FROM schedule WHERE Mtg_Days = 'nan'").fetchone()[0]
+        nulls = conn.execute("SELECT COUNT(*) FROM schedule WHERE Mtg_Days IS NULL OR STime IS NULL").fetchone()[0]
+        conn.close()
+        self.assertGreater(online, 0)
+        self.assertEqual(nulls, 0)
+
+    def test_export_in_another_directory(self):
+        os.mkdir('data')
+        shutil.move('sample_schedule_SP24_6.csv', 'data')
+        self.ingest(os.path.join('data', 'sample_schedule_SP24_6.csv'), 'raw.db')
+        self.assertTrue(os.path.exists(os.path.join('data', 'cleaned_sample_schedule_SP24_6.csv')))
+        cleaned_parquet = os.path.join('data', 'cleaned_sample_schedule_SP24_6.parquet')
+        self.assertTrue(os.path.exists(cleaned_parquet))
+        self.ingest(cleaned_parquet, 'parquet.db')
+        self.assertEqual(table_dump('parquet.db', 'schedule'), table_dump('raw.db', 'schedule'))
+
+if __name__ == "__main__":
+    unittest.main()
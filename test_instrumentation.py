@@ -0,0 +1,48 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from contextlib import contextmanager
+
+from catalog import connect
+from instrumentation import PipelineStats
+from main import generate_schedules
+from profiling import StageProfiler
+
+DB_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule.db')
+
+class SlowProfiler:
+    '''A profiler whose own work (before and after each stage) takes 0.2 s.'''
+    @contextmanager
+    def stage(self, name):
+        time.sleep(0.1)
+        yield
+        time.sleep(0.1)
+
+class PipelineStatsTest(unittest.TestCase):
+    def test_profiler_cost_not_timed(self):
+        stats = PipelineStats(profiler=SlowProfiler())
+        with stats.stage("validation"):
+            pass
+        self.assertLess(stats.stages["validation"]["wall"], 0.05)
+        self.assertEqual(stats.stages["validation"]["calls"], 1)
+
+    def test_sampled_request_profiles_every_stage(self):
+        profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, profile_dir)
+        profiler = StageProfiler(profile_dir)
+        stats = PipelineStats(profiler=profiler)
+        conn = connect(DB_NAME)
+        try:
+            with profiler.request("request"):
+                generate_schedules(conn.cursor(), ["ENG-103", "PSY-103"], {}, {}, top_k=5, stats=stats)
+        finally:
+            conn.close()
+        files = os.listdir(os.path.join(profile_dir, "request"))
+        for name in stats.stages:
+            self.assertIn(f"{name}.prof", files)
+            self.assertIn(f"{name}.alloc.txt", files)
+
+if __name__ == "__main__":
+    unittest.main()
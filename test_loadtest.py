@@ -0,0 +1,34 @@
+import os
+import unittest
+from io import StringIO
+
+from catalog import connect
+from loadtest import DirectTarget, run_load, synthetic_requests
+from service import parse_request
+
+DB_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule.db')
+
+class LoadTestTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        conn = connect(DB_NAME)
+        cls.requests = synthetic_requests(conn.cursor(), 40, top_k=5)
+        conn.close()
+
+    def test_synthetic_requests_parse(self):
+        for request in self.requests:
+            parse_request(request)
+
+    def test_direct_target_has_no_errors(self):
+        target = DirectTarget(DB_NAME)
+        try:
+            report = run_load(target, self.requests, rate=0, concurrency=2, duration=60.0,
+                              max_requests=len(self.requests), interval=60.0, out=StringIO())
+        finally:
+            target.close()
+        summary = report["summary"]
+        self.assertEqual(summary["errors"], 0, summary["error_types"])
+        self.assertEqual(summary["completed"], len(self.requests))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from catalog import connect
+from main import generate_schedules
+from schedule_cache import ScheduleCache, cached_generate_schedules
+
+DB_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule.db')
+
+def rendered(results):
+    '''Section names and scores of every ranked schedule, in rank order.'''
+    return [([section["Name"] for section in results.combination(i)], results[i][1:]) for i in range(len(results))]
+
+class ScheduleCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.conn = connect(DB_NAME)
+        self.cursor = self.conn.cursor()
+        self.addCleanup(self.conn.close)
+
+    def test_hit_matches_fresh_run(self):
+        cache = ScheduleCache()
+        blocks = {"Mon": [("12:00 AM", "10:00 AM")]}
+        requests = [
+            (["NUR-180", "LIB-110", "LBL-101", "ENG-103"], 10),
+            (["ENG-103", "LBL-101", "LIB-110", "NUR-180"], 10),
+            (["ENG-103", ("MAT-143", "MAT-152")], 5),
+            ([("MAT-152", "MAT-143"), "ENG-103"], 5),
+        ]
+        for courses, top_k in requests + requests:
+            with self.subTest(courses=courses):
+                cached = cached_generate_schedules(cache, self.cursor, courses, {}, blocks, top_k=top_k)
+                fresh = generate_schedules(self.cursor, courses, {}, blocks, top_k=top_k)
+                self.assertEqual(rendered(cached), rendered(fresh))
+        self.assertEqual((cache.hits, cache.misses), (len(requests), len(requests)))
+
+    def test_availability_order_shares_entry(self):
+        cache = ScheduleCache()
+        cached_generate_schedules(cache, self.cursor, ["ENG-103"], {}, {"Mon": [("12:00 AM", "08:00 AM")], "Tue": []})
+        cached_generate_schedules(cache, self.cursor, ["ENG-103"], {}, {"Tue": [], "Mon": [("12:00 AM", "08:00 AM")]})
+        self.assertEqual(cache.hits, 1)
+
+class ScheduleCacheInvalidationTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.db_name = os.path.join(directory, 'schedule.db')
+        shutil.copy(DB_NAME, self.db_name)
+        self.conn = connect(self.db_name)
+        self.addCleanup(self.conn.close)
+        self.cache = ScheduleCache()
+
+    def schedule(self):
+        return cached_generate_schedules(self.cache, self.conn.cursor(), ["ENG-103", "PSY-103"], {}, {}, top_k=5)
+
+    def write(self, sql, parameters=()):
+        conn = sqlite3.connect(self.db_name)
+        conn.execute(sql, parameters)
+        conn.commit()
+        conn.close()
+
+    def test_seat_change_invalidates(self):
+        first = self.schedule()
+        self.schedule()
+        self.assertEqual(self.cache.hits, 1)
+        taken = first.combination(0)[0]["Name"]
+        self.write("UPDATE schedule SET Avail_Seats = 0 WHERE Name = ?", (taken,))
+        fresh = self.schedule()
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+        self.assertNotIn(taken, [section["Name"] for i in range(len(fresh)) for section in fresh.combination(i)])
+
+    def test_unrelated_seat_change_keeps_entry(self):
+        self.schedule()
+        self.write("UPDATE schedule SET Avail_Seats = Avail_Seats + 1 WHERE Course_Name = 'BIO-171'")
+        self.schedule()
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_catalog_reload_invalidates(self):
+        self.schedule()
+        self.write("PRAGMA user_version = 12345")
+        self.schedule()
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+    def test_lru_bound(self):
+        self.cache = ScheduleCache(maxsize=2)
+        for courses in (["ENG-103"], ["PSY-103"], ["COM-100"], ["ENG-103"]):
+            cached_generate_schedules(self.cache, self.conn.cursor(), courses, {}, {}, top_k=5)
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.hits, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import http.client
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from profiling import StageProfiler
+from service import ScheduleServer
+
+DB_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule.db')
+
+class ScheduleServiceTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ScheduleServer(port=0, db_name=DB_NAME)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def post(self, path, payload):
+        conn = http.client.HTTPConnection(*self.server.server_address)
+        try:
+            conn.request("POST", path, json.dumps(payload), {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            conn.close()
+
+    def assertBadRequest(self, path, payload):
+        status, body = self.post(path, payload)
+        self.assertEqual(status, 400, body)
+        self.assertIn("error", body)
+
+    def test_schedules(self):
+        status, body = self.post("/schedules", {
+            "courses": ["ENG-103", ["MAT-143", "MAT-152"]], "top_k": 3,
+            "modality_preferences": {"ENG-103": "LEC"},
+            "unavailability_blocks": {"Mon": [["12:00 AM", "10:00 AM"]]},
+        })
+        self.assertEqual(status, 200)
+        self.assertEqual(body["count"], len(body["schedules"]))
+        self.assertLessEqual(body["count"], 3)
+
+    def test_schedules_malformed(self):
+        self.assertBadRequest("/schedules", ["ENG-103"])
+        self.assertBadRequest("/schedules", {"courses": []})
+        self.assertBadRequest("/schedules", {"courses": ["ENG-103"], "top_k": "5"})
+        self.assertBadRequest("/schedules", {"courses": ["ENG-103"], "modality_preferences": ["LEC"]})
+        self.assertBadRequest("/schedules", {"courses": ["ENG-103"], "modality_preferences": {"ENG-103": 1}})
+        self.assertBadRequest("/schedules", {"courses": ["ENG-103"], "unavailability_blocks": [["12:00 AM", "10:00 AM"]]})
+        self.assertBadRequest("/schedules", {"courses": ["ENG-103"], "unavailability_blocks": {"Mon": "12:00 AM"}})
+        self.assertBadRequest("/schedules", {"courses": ["ENG-103"], "unavailability_blocks": {"Mon": [["bad", "10:00 AM"]]}})
+
+    def test_cohort(self):
+        status, body = self.post("/cohort", {"students": [{"id": 1, "courses": ["ENG-103"]}, {"id": 2, "courses": ["ENG-103"]}]})
+        self.assertEqual(status, 200)
+        self.assertEqual(body["summary"]["students"], 2)
+
+    def test_cohort_malformed(self):
+        self.assertBadRequest("/cohort", [{"id": 1, "courses": ["ENG-103"]}])
+        self.assertBadRequest("/cohort", {"students": []})
+        self.assertBadRequest("/cohort", {"students": ["ENG-103"]})
+        self.assertBadRequest("/cohort", {"students": [{"id": 1, "courses": ["ENG-103"]}], "options_per_student": "20"})
+        self.assertBadRequest("/cohort", {"students": [{"id": 1, "courses": ["ENG-103"], "unavailability_blocks": []}]})
+
+class ProfiledServiceTest(unittest.TestCase):
+    def test_every_nth_request_is_profiled(self):
+        profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, profile_dir)
+        server = ScheduleServer(port=0, db_name=DB_NAME, cache_size=0, profiler=StageProfiler(profile_dir, sample_every=2))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            for _ in range(3):
+                conn = http.client.HTTPConnection(*server.server_address)
+                conn.request("POST", "/schedules", json.dumps({"courses": ["ENG-103", "PSY-103"]}))
+                self.assertEqual(conn.getresponse().status, 200)
+                conn.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+        profiled = os.listdir(profile_dir)
+        self.assertEqual(len(profiled), 2)  # requests 1 and 3
+        self.assertIn("enumeration.prof", os.listdir(os.path.join(profile_dir, profiled[0])))
+
+if __name__ == "__main__":
+    unittest.main()
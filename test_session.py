@@ -0,0 +1,155 @@
+import os
+import unittest
+from itertools import product
+
+from catalog import connect
+from main import default_config, process_corequisites, retrieve_section_info
+from session import (BREAK_DAYS, DAY_MAP, GAP_DAYS, ScheduleSession, flatten_courses, parse_date, parse_minutes,
+                     slot_courses, split_meetings)
+
+DB_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule.db')
+
+def parsed_section(section):
+    meetings = [(day, parse_minutes(start), parse_minutes(end)) for day, start, end in split_meetings(
+        section["Mtg_Days"], section["STime_Extra"] or section["STime"], section["ETime_Extra"] or section["ETime"])]
+    return meetings, parse_date(section["SDate"]), parse_date(section["EDate"])
+
+def sections_conflict(parsed, other):
+    meetings, start_date, end_date = parsed
+    other_meetings, other_start_date, other_end_date = other
+    if not (start_date <= other_end_date and end_date >= other_start_date):
+        return False
+    return any(day == other_day and start < other_end and end > other_start
+               for day, start, end in meetings if start is not None and end is not None
+               for other_day, other_start, other_end in other_meetings if other_start is not None and other_end is not None)
+
+def reference_schedules(selected_courses, sections_info, unavailability_blocks, config):
+    '''Every valid schedule with its scores, one combination at a time: (names, combined, modality, days, gaps).'''
+    blocks = {day: [(parse_minutes(start), parse_minutes(end)) for start, end in day_blocks]
+              for day, day_blocks in unavailability_blocks.items()}
+    break_start = parse_minutes(config["gap_weights"]["mandatory_break_start"])
+    break_end = parse_minutes(config["gap_weights"]["mandatory_break_end"])
+    max_allowed_gap = config["gap_weights"]["max_allowed_gap"]
+    day_weights = config["day_weights"]
+    weights = config["weights"]
+
+    options_per_slot = []
+    parsed = {}
+    for slot in selected_courses:
+        options = []
+        for course in slot_courses(slot):
+            for section, coreqs in sections_info.get(course, []):
+                for member in [section] + coreqs:
+                    parsed[member["Name"]] = parsed_section(member)
+                options += [(course, section, coreq) for coreq in coreqs] if coreqs else [(course, section)]
+        options_per_slot.append(options)
+
+    schedules = []
+    for options in product(*options_per_slot):
+        courses = [option[0] for option in options]
+        if len(set(courses)) < len(courses):
+            continue
+        sections = [option[1] for option in options] + [option[2] for option in options if len(option) > 2]
+        meetings = [parsed[section["Name"]][0] for section in sections]
+        if any(sections_conflict(parsed[a["Name"]], parsed[b["Name"]]) for i, a in enumerate(sections) for b in sections[i + 1:]):
+            continue
+        if any(start < block_end and end > block_start
+               for section_meetings in meetings for day, start, end in section_meetings if start is not None and end is not None
+               for block_start, block_end in blocks.get(DAY_MAP.get(day), ())):
+            continue
+
+        modality_score = 0
+        for section in sections:
+            preferred = config["preferences"].get('-'.join(section["Name"].split('-')[:2]))
+            if preferred and section["Method"] != preferred:
+                modality_score += 1
+        campus_days = {day for section, section_meetings in zip(sections, meetings) if section["Method"] != "ONLIN"
+                       for day, _, _ in section_meetings}
+        days_score = day_weights.get(len(campus_days), max(day_weights.values()))
+        gap_score = 0
+        for day in GAP_DAYS:
+            day_meetings = sorted(((start, end) for section_meetings in meetings for meeting_day, start, end in section_meetings
+                                   if meeting_day == day), key=lambda meeting: (meeting[0] or 0, meeting[1] or 0))
+            for (_, prev_end), (curr_start, _) in zip(day_meetings, day_meetings[1:]):
+                if prev_end is None or curr_start is None:
+                    continue
+                if day in BREAK_DAYS and prev_end <= break_start and curr_start >= break_end:
+                    continue
+                gap_minutes = (curr_start - prev_end) % 1440
+                if gap_minutes > max_allowed_gap:
+                    gap_score += round(gap_minutes / 60) ** 2
+        combined = weights["modality"] * modality_score + weights["days"] * days_score + weights["gaps"] * gap_score
+        schedules.append((tuple(section["Name"] for section in sections), combined, modality_score, days_score, gap_score))
+    return schedules
+
+class ScheduleSessionTest(unittest.TestCase):
+    CASES = [
+        # multi-meeting sections (MAT-151) and lecture/lab corequisites (BIO-171)
+        (["MAT-151", "PSY-103", "BIO-171"], {}, {}),
+        (["BIO-121", "PHY-105", "COM-100"], {"BIO-121": "LEC"}, {"Tue": [("12:00 AM", "11:00 AM")]}),
+        ([("MAT-143", "MAT-151"), "COM-100", "PSY-103"], {"PSY-103": "ONLIN"},
+         {"Mon": [("12:00 AM", "09:00 AM"), ("05:00 PM", "11:59 PM")], "Wed": [("12:00 AM", "09:00 AM")]}),
+        (["ENG-103", "LBL-101", "LIB-110", "NUR-180"], {}, {"Fri": [("12:00 AM", "11:59 PM")]}),
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.conn = connect(DB_NAME)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+
+    def open(self, selected_courses):
+        cursor = self.conn.cursor()
+        sections_info, section_columns = retrieve_section_info(cursor, flatten_courses(selected_courses))
+        sections_info, _ = process_corequisites(cursor, sections_info, section_columns)
+        return sections_info, ScheduleSession(selected_courses, sections_info)
+
+    def rendered(self, session, results):
+        return [(tuple(session.sections[index]["Name"] for index in result[0]), *result[1:]) for result in results]
+
+    def test_matches_reference(self):
+        for selected_courses, preferences, blocks in self.CASES:
+            sections_info, session = self.open(selected_courses)
+            config = default_config(preferences)
+            expected = reference_schedules(selected_courses, sections_info, blocks, config)
+            self.assertGreater(len(expected), 0, selected_courses)
+            with self.subTest(courses=selected_courses):
+                results = self.rendered(session, session.run(blocks, config))
+                self.assertEqual(sorted(results), sorted(expected))
+                self.assertEqual([result[1] for result in results], sorted(result[1] for result in expected))
+            for top_k in (1, 7, 40):
+                with self.subTest(courses=selected_courses, top_k=top_k):
+                    results = self.rendered(session, session.run(blocks, config, top_k))
+                    self.assertEqual([result[1] for result in results], sorted(result[1] for result in expected)[:top_k])
+                    self.assertLessEqual(set(results), set(expected))
+
+    def test_session_reused_across_requests(self):
+        selected_courses, preferences, blocks = self.CASES[1]
+        sections_info, session = self.open(selected_courses)
+        for unavailability_blocks in ({}, blocks, {}):
+            config = default_config(preferences)
+            expected = reference_schedules(selected_courses, sections_info, unavailability_blocks, config)
+            self.assertEqual(sorted(self.rendered(session, session.run(unavailability_blocks, config))), sorted(expected))
+
+    def test_weights_change_the_ranking(self):
+        selected_courses, preferences, blocks = self.CASES[0]
+        sections_info, session = self.open(selected_courses)
+        config = default_config(preferences)
+        config["weights"] = {"modality": 0, "days": 0, "gaps": 1}
+        expected = reference_schedules(selected_courses, sections_info, blocks, config)
+        results = self.rendered(session, session.run(blocks, config, 10))
+        self.assertEqual([result[1] for result in results], sorted(result[1] for result in expected)[:10])
+        self.assertTrue(all(result[1] == result[4] for result in results))
+
+    def test_only_untimed_sections_when_week_blocked(self):
+        selected_courses = ["PSY-103", "COM-100"]
+        sections_info, session = self.open(selected_courses)
+        blocks = {day: [("12:00 AM", "11:59 PM")] for day in DAY_MAP.values()}
+        config = default_config({})
+        expected = reference_schedules(selected_courses, sections_info, blocks, config)
+        self.assertEqual(sorted(self.rendered(session, session.run(blocks, config))), sorted(expected))
+
+if __name__ == "__main__":
+    unittest.main()
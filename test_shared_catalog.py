@@ -0,0 +1,74 @@
+import os
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog import connect
+from main import generate_schedules, process_corequisites, retrieve_section_info
+from shared_catalog import SharedCatalog, init_worker, worker_generate_schedules
+
+DB_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule.db')
+
+REQUESTS = [
+    (["ENG-103", "PSY-103"], {}, {}),
+    (["MAT-151", "BIO-171", ("COM-100", "COM-220")], {"BIO-171": "LEC"}, {"Tue": [("12:00 AM", "10:00 AM")]}),
+]
+
+def rendered(results):
+    return [([section["Name"] for section in results.combination(i)], results[i][1:]) for i in range(len(results))]
+
+class SharedCatalogTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.conn = connect(DB_NAME)
+        cls.shared = SharedCatalog.publish(cls.conn.cursor())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.shared.close()
+        cls.conn.close()
+
+    def test_sections_info_matches_database(self):
+        courses = ["ENG-103", "MAT-151", "BIO-171", "BIO-171L", "PHY-105"]
+        cursor = self.conn.cursor()
+        sections_info, section_columns = retrieve_section_info(cursor, courses)
+        expected, _ = process_corequisites(cursor, sections_info, section_columns)
+        shared_info, section_patterns = self.shared.sections_info(courses)
+        self.assertEqual(shared_info, expected)
+        for sections in shared_info.values():
+            for section, coreqs in sections:
+                for member in [section] + coreqs:
+                    self.assertIn(member["Name"], section_patterns)
+
+    def test_find_section(self):
+        name = self.conn.execute("SELECT Name FROM schedule WHERE Status = 'A' AND Avail_Seats > 0 LIMIT 1").fetchone()[0]
+        self.assertEqual(self.shared.section(self.shared.find_section(name))["Name"], name)
+        self.assertIsNone(self.shared.find_section("XYZ-999-001"))
+        self.assertEqual(len(self.shared.course_sections("XYZ-999")), 0)
+
+    def test_generate_schedules_matches_database(self):
+        for courses, preferences, blocks in REQUESTS:
+            with self.subTest(courses=courses):
+                expected = generate_schedules(self.conn.cursor(), courses, preferences, blocks, top_k=20)
+                results = self.shared.generate_schedules(courses, preferences, blocks, top_k=20)
+                self.assertEqual(rendered(results), rendered(expected))
+
+    def test_worker_processes(self):
+        with ProcessPoolExecutor(2, initializer=init_worker, initargs=(self.shared.name,)) as executor:
+            futures = [executor.submit(worker_generate_schedules, courses, preferences, blocks, None, 20)
+                       for courses, preferences, blocks in REQUESTS]
+            for (courses, preferences, blocks), future in zip(REQUESTS, futures):
+                expected = generate_schedules(self.conn.cursor(), courses, preferences, blocks, top_k=20)
+                self.assertEqual(rendered(future.result()), rendered(expected))
+
+    def test_close_frees_block(self):
+        shared = SharedCatalog.publish(self.conn.cursor())
+        name = shared.name
+        attached = SharedCatalog.attach(name)
+        self.assertEqual(attached.section_count, shared.section_count)
+        attached.close()
+        shared.close()
+        with self.assertRaises(FileNotFoundError):
+            SharedCatalog.attach(name)
+
+if __name__ == "__main__":
+    unittest.main()
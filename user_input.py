@@ -1,20 +1,40 @@
 # Set up the environment
-import sqlite3
+import catalog
+from course_index import CourseIndex
 
 # Set the maximum number of courses a user can request
 max_course_number = 8
 
-# Connect to the SQLite database
-conn = sqlite3.connect('schedule.db')
-cursor = conn.cursor()
+def find_courses(index, entry):
+    '''
+    Course names for one typed entry. "BIO-151/BIO-171" lists alternatives (any one of them will do);
+    an alternative without a dash is a program code from Sec_Course_Types (e.g. GEHUM = any gen-ed humanities course).
+    '''
+    course_names = []
+    for alternative in entry.split('/'):
+        alternative = alternative.strip()
+        if not alternative:
+            continue
+        if '-' in alternative:
+            course_names.append(alternative)
+            continue
+        course_names.extend(index.program_courses(alternative) or [alternative])
+    return list(dict.fromkeys(course_names))
 
 # Get user input (course selection)
-def get_course_names(cursor, max_course_number):
+def get_course_names(cursor, max_course_number, index=None):
+    '''
+    Selected courses are course names, or tuples of alternative course names for "any of" entries
+    (typed as BIO-151/BIO-171 or as a program code such as GEHUM); the schedule then contains one of them.
+    Lookups go through a course_index.CourseIndex (built from the cursor unless one is passed in).
+    '''
+    index = index or CourseIndex.from_cursor(cursor)
     selected_courses = []
     unavailable_courses = []
     modality_preferences = {}
 
     print(f"Please enter up to {max_course_number} courses. Hit Enter without typing a course name to finish early.")
+    print("To accept any one of several courses, separate them with '/' (e.g. BIO-151/BIO-171) or enter a program code (e.g. GEHUM).")
 
     for i in range(1, max_course_number + 1):
         while True:
@@ -22,20 +42,21 @@ def get_course_names(cursor, max_course_number):
             if not course_name:
                 break
 
+            course_names = find_courses(index, course_name)
+            if len(course_names) > 1:
+                alternatives = get_alternatives(index, course_names, selected_courses, unavailable_courses, modality_preferences)
+                if alternatives:
+                    selected_courses.append(alternatives)
+                    break
+                continue
+
+            course_name = course_names[0] if course_names else course_name
             if course_name in selected_courses:
                 print(f"  You have already entered {course_name}. Please enter a different course or hit Enter to finish.")
                 continue
 
-            cursor.execute("SELECT DISTINCT Course_Name FROM schedule WHERE Course_Name = ?", (course_name,))
-            course = cursor.fetchone()
-
-            if course:
-                cursor.execute("""
-                    SELECT DISTINCT Method
-                    FROM schedule
-                    WHERE Course_Name = ? AND Status = 'A' AND Avail_Seats > 0
-                """, (course_name,))
-                modalities = [row[0] for row in cursor.fetchall()]
+            if course_name in index:
+                modalities = index.available_modalities(course_name)
 
                 if modalities:
                     if len(modalities) == 1:
@@ -47,16 +68,9 @@ def get_course_names(cursor, max_course_number):
                             break
                     else:
                         print(f"  Available modalities for {course_name}: {', '.join(modalities)}")
-                        while True:
-                            preference = input(f"  Do you have a preference? ({'/'.join(modalities)}/no): ").strip().upper()
-                            if preference in modalities or preference == 'NO':
-                                if preference == 'NO':
-                                    preference = None
-                                modality_preferences[course_name] = preference
-                                selected_courses.append(course_name)
-                                break
-                            else:
-                                print("  Invalid input. Please enter a valid modality or 'no'.")
+                        preference = get_modality_preference(modalities)
+                        modality_preferences[course_name] = preference
+                        selected_courses.append(course_name)
                         break
                 else:
                     unavailable_courses.append(course_name)
@@ -69,38 +83,88 @@ def get_course_names(cursor, max_course_number):
 
     return selected_courses, unavailable_courses, modality_preferences
 
-def print_user_input_summary(cursor, selected_courses, unavailable_courses, modality_preferences):
+def get_modality_preference(modalities):
+    while True:
+        preference = input(f"  Do you have a preference? ({'/'.join(modalities)}/no): ").strip().upper()
+        if preference in modalities or preference == 'NO':
+            return None if preference == 'NO' else preference
+        print("  Invalid input. Please enter a valid modality or 'no'.")
+
+def get_alternatives(index, course_names, selected_courses, unavailable_courses, modality_preferences):
+    '''Check the courses of an "any of" entry; returns the tuple of alternatives with open sections, or None.'''
+    alternatives = []
+    modalities = []
+    for course_name in course_names:
+        course_modalities = index.available_modalities(course_name)
+        if course_modalities:
+            alternatives.append(course_name)
+            modalities.extend(modality for modality in course_modalities if modality not in modalities)
+        elif course_name in index:
+            unavailable_courses.append(course_name)
+            print(f"  No sections are available for the course: {course_name}")
+        else:
+            print(f"  Course not found in the database: {course_name}")
+
+    if not alternatives:
+        print("  None of these courses has available sections. Please enter a different course or hit Enter to finish.")
+        return None
+    entry = tuple(alternatives) if len(alternatives) > 1 else alternatives[0]
+    if entry in selected_courses:
+        print("  You have already entered these courses. Please enter a different course or hit Enter to finish.")
+        return None
+
+    print(f"  Any one of {len(alternatives)} courses: {', '.join(alternatives)}")
+    preference = None
+    if len(modalities) > 1:
+        print(f"  Available modalities: {', '.join(modalities)}")
+        preference = get_modality_preference(modalities)
+    for course_name in alternatives:
+        modality_preferences[course_name] = preference
+    return entry
+
+def describe_course(index, course_name, modality_preferences):
+    course = index.get(course_name)
+    if not course:
+        return None
+    coreqs_text = " (has corequisite)" if course.has_coreq else ""
+    modality_pref = modality_preferences.get(course_name)
+    modality_text = f" (preference: {modality_pref})" if modality_pref else ""
+    return f"{course_name} \"{course.title}\"{modality_text}{coreqs_text}"
+
+def print_user_input_summary(cursor, selected_courses, unavailable_courses, modality_preferences, index=None):
+    index = index or CourseIndex.from_cursor(cursor)
     print("\nYou selected the following courses:")
-    for course_name in selected_courses:
-        cursor.execute("SELECT Short_Title, Corequisite FROM schedule WHERE Course_Name = ?", (course_name,))
-        course_info = cursor.fetchone()
-        if course_info:
-            short_title, coreqs = course_info
-            coreqs_text = " (has corequisite)" if coreqs else ""
-            modality_pref = modality_preferences.get(course_name)
-            modality_text = f" (preference: {modality_pref})" if modality_pref else ""
-            print(f"{course_name} \"{short_title}\"{modality_text}{coreqs_text}")
+    for entry in selected_courses:
+        if isinstance(entry, tuple):
+            print("Any one of:")
+            for course_name in entry:
+                description = describe_course(index, course_name, modality_preferences)
+                if description:
+                    print(f"  {description}")
+        else:
+            description = describe_course(index, entry, modality_preferences)
+            if description:
+                print(description)
 
     if unavailable_courses:
         print("\nThe following courses are not available:")
         for course_name in unavailable_courses:
-            cursor.execute("SELECT Short_Title FROM schedule WHERE Course_Name = ?", (course_name,))
-            short_title = cursor.fetchone()[0]
-            cursor.execute("SELECT COUNT(*) FROM schedule WHERE Course_Name = ? AND Status = 'P'", (course_name,))
-            pending_sections_count = cursor.fetchone()[0]
+            course = index.get(course_name)
+            pending_sections_count = course.pending_sections
             pending_sections_text = f"This course has {pending_sections_count} pending sections" if pending_sections_count > 0 else "All sections are full and there are no pending sections"
-            print(f"{course_name} \"{short_title}\": {pending_sections_text}")
+            print(f"{course_name} \"{course.title}\": {pending_sections_text}")
         print()
 
 def main():
     # Connect to the SQLite database
-    conn = sqlite3.connect('schedule.db')
+    conn = catalog.connect()
     cursor = conn.cursor()
 
-    selected_courses, unavailable_courses, modality_preferences = get_course_names(cursor, max_course_number)
+    index = CourseIndex.from_cursor(cursor)
+    selected_courses, unavailable_courses, modality_preferences = get_course_names(cursor, max_course_number, index)
 
     # Print user input summary
-    print_user_input_summary(cursor, selected_courses, unavailable_courses, modality_preferences)
+    print_user_input_summary(cursor, selected_courses, unavailable_courses, modality_preferences, index)
 
     # Close the connection
     conn.close()